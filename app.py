@@ -1,55 +1,87 @@
 import streamlit as st
-import requests
-import json
-import os
+import httpx
+import orjson
 from typing import Dict, List
-import tempfile
+import numpy as np
+import pandas as pd
 
 # Constants
 API_URL = "http://localhost:8000"
 
+@st.cache_resource
+def get_api_client() -> httpx.Client:
+    """Shared HTTP client that keeps connections to the API alive across reruns"""
+    return httpx.Client(
+        base_url=API_URL,
+        http2=True,
+        timeout=httpx.Timeout(60.0),
+        limits=httpx.Limits(max_keepalive_connections=20)
+    )
+
 def upload_single_resume(file, requirements: Dict) -> Dict:
     """Upload and screen a single resume"""
     
     if not file:
         return None
         
-    # Create temporary requirements file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as req_file:
-        json.dump(requirements, req_file)
-        req_file_path = req_file.name
-        
     try:
         files = {
             'file': ('resume.pdf', file.getvalue(), 'application/pdf'),
-            'requirements': ('requirements.json', open(req_file_path, 'rb'), 'application/json')
+            'requirements': ('requirements.json', orjson.dumps(requirements), 'application/json')
         }
         
-        response = requests.post(f"{API_URL}/screen-resume/", files=files)
+        response = get_api_client().post("/screen-resume/", files=files)
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
         
     except Exception as e:
         st.error(f"Error processing resume: {str(e)}")
         return None
-    finally:
-        if os.path.exists(req_file_path):
-            os.remove(req_file_path)
 
 def screen_drive_resumes(folder_id: str, requirements: Dict) -> List[Dict]:
     """Screen all resumes in a Google Drive folder"""
     try:
-        response = requests.post(
-            f"{API_URL}/screen-resumes/",
+        response = get_api_client().post(
+            "/screen-resumes/",
             params={"folder_id": folder_id},
-            json=requirements
+            content=orjson.dumps(requirements),
+            headers={"Content-Type": "application/json"},
+            timeout=None  # Screening a whole folder can take minutes
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     except Exception as e:
         st.error(f"Error screening resumes: {str(e)}")
         return []
 
+def skills_match_percentage(results: Dict) -> float:
+    """Calculate skills match percentage"""
+    total_skills = len(results['matching_skills']) + len(results['missing_skills'])
+    if total_skills > 0:
+        return len(results['matching_skills']) / total_skills * 100
+    return 0
+
+@st.cache_data
+def build_skills_table(matching_skills: List[str], missing_skills: List[str]) -> pd.DataFrame:
+    """Build a two-column table of matching and missing skills"""
+    rows = max(len(matching_skills), len(missing_skills))
+    return pd.DataFrame({
+        "✅ Matching Skills": matching_skills + [''] * (rows - len(matching_skills)),
+        "❌ Missing Skills": missing_skills + [''] * (rows - len(missing_skills))
+    })
+
+@st.cache_data
+def build_ranking_table(results: List[Dict]) -> pd.DataFrame:
+    """Build one summary row per candidate, in ranked order"""
+    return pd.DataFrame({
+        "Rank": range(1, len(results) + 1),
+        "Name": [result['name'] for result in results],
+        "Score": [result['match_score'] for result in results],
+        "Skills Match": [skills_match_percentage(result) for result in results],
+        "Experience": [result['experience_match'] * 100 for result in results],
+        "Education": [result['education_match'] * 100 for result in results]
+    })
+
 def display_results(results: Dict):
     """Display resume screening results"""
     if not results:
@@ -65,29 +97,32 @@ def display_results(results: Dict):
         st.metric("Experience Match", f"{results['experience_match'] * 100:.1f}%")
         
     with col2:
-        # Calculate skills match percentage
-        total_skills = len(results['matching_skills']) + len(results['missing_skills'])
-        if total_skills > 0:
-            skills_match = len(results['matching_skills']) / total_skills * 100
-        else:
-            skills_match = 0
-            
-        st.metric("Skills Match", f"{skills_match:.1f}%")
+        st.metric("Skills Match", f"{skills_match_percentage(results):.1f}%")
         st.metric("Education Match", f"{results['education_match'] * 100:.1f}%")
     
-    # Display skills breakdown
+    # Display skills breakdown as a single table
     st.write("#### Skills Analysis")
-    skill_cols = st.columns(2)
-    
-    with skill_cols[0]:
-        st.write("✅ Matching Skills")
-        for skill in results['matching_skills']:
-            st.markdown(f"- {skill}")
-            
-    with skill_cols[1]:
-        st.write("❌ Missing Skills")
-        for skill in results['missing_skills']:
-            st.markdown(f"- {skill}")
+    st.dataframe(
+        build_skills_table(results['matching_skills'], results['missing_skills']),
+        hide_index=True,
+        use_container_width=True
+    )
+
+@st.fragment
+def candidate_details(sorted_results: List[Dict]):
+    """Show the full breakdown for one selected candidate.
+
+    Runs as a fragment so picking another candidate only reruns this panel.
+    """
+    selected = st.selectbox(
+        "Candidate details",
+        range(len(sorted_results)),
+        format_func=lambda i: (
+            f"#{i + 1} - {sorted_results[i]['name']} "
+            f"({sorted_results[i]['match_score']:.1f}% Match)"
+        )
+    )
+    display_results(sorted_results[selected])
 
 def main():
     st.set_page_config(
@@ -149,15 +184,26 @@ def main():
                     st.success(f"Successfully processed {len(results)} resumes!")
                     
                     # Display sorted results
-                    sorted_results = sorted(
-                        results,
-                        key=lambda x: x['match_score'],
-                        reverse=True
+                    scores = np.fromiter(
+                        (result['match_score'] for result in results),
+                        dtype=np.float32,
+                        count=len(results)
+                    )
+                    order = np.argsort(-scores, kind='stable')
+                    sorted_results = [results[i] for i in order]
+                    
+                    # Summary of all candidates in a single table
+                    st.dataframe(
+                        build_ranking_table(sorted_results),
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={
+                            column: st.column_config.NumberColumn(format="%.1f%%")
+                            for column in ["Score", "Skills Match", "Experience", "Education"]
+                        }
                     )
                     
-                    for i, result in enumerate(sorted_results, 1):
-                        with st.expander(f"#{i} - {result['name']} ({result['match_score']:.1f}% Match)"):
-                            display_results(result)
+                    candidate_details(sorted_results)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
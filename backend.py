@@ -1,24 +1,28 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, Body
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, Body, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import tempfile
 import os
-from processor import ResumeProcessor
+from processor import ResumeProcessor, parse_and_preprocess, PARSER_VERSION, PREPROCESS_VERSION
 from storage import GoogleDriveConnector
 from ranking import RankingEngine
+from cache import resume_cache, CACHE_TTL, HashingWriter, new_content_hasher, content_hash
 from dotenv import load_dotenv
+from cachetools import TTLCache
 import os
-import json
+import orjson
 import aiofiles
 import logging
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 
 
 # Add at the start of the file, after imports
 load_dotenv()
 
-app = FastAPI(title="ATS Resume Screening API")
+app = FastAPI(title="ATS Resume Screening API", default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -29,7 +33,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize our components
+# Worker counts for each stage of the bulk screening pipeline
+DOWNLOAD_WORKERS = 16
+# Maximum number of in-flight LLM analysis requests
+ANALYZE_CONCURRENCY = 8
+
+# Uploads are copied to disk in chunks of this size to bound memory use
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Process pool for CPU-bound PDF parsing and NLP preprocessing. Created on
+# first use so a preloading server (gunicorn --preload) doesn't fork it into workers
+PDF_POOL_WORKERS = os.cpu_count() or 1
+# One preprocess task per pool worker keeps every core busy
+PREPROCESS_WORKERS = PDF_POOL_WORKERS
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Return this process's PDF pool, creating it on first use"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=PDF_POOL_WORKERS)
+    return _pdf_pool
+
+# Recent /screen-resume/ results keyed by ETag ("resume_hash:requirements_hash")
+screening_response_cache = TTLCache(maxsize=1024, ttl=15 * 60)
+
+# Initialize our components. They are built at import time so that under
+# gunicorn --preload (see gunicorn.conf.py) the embedding model is loaded once
+# in the master and shared copy-on-write by every worker
 resume_processor = ResumeProcessor()
 drive_connector = GoogleDriveConnector()
 ranking_engine = RankingEngine()
@@ -80,22 +111,79 @@ async def startup_event():
         
     drive_connector.authenticate()
 
+    # Load models and start pool workers now rather than on the first request
+    await asyncio.to_thread(resume_processor.warmup)
+    await asyncio.gather(*(
+        run_in_pdf_pool(ResumeProcessor.preprocess_resume, "warmup")
+        for _ in range(PDF_POOL_WORKERS)
+    ))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker processes"""
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+
+async def run_in_pdf_pool(func, *args):
+    """Run a CPU-bound function in the PDF process pool without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(get_pdf_pool(), func, *args)
+
+async def save_upload_to_temp(file: UploadFile, suffix: str) -> Tuple[str, str]:
+    """Stream an uploaded file to a temporary file in fixed-size chunks.
+
+    Returns the temp file path and the content hash of the uploaded bytes.
+    """
+    hasher = new_content_hasher()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        temp_path = temp_file.name
+    try:
+        async with aiofiles.open(temp_path, 'wb') as f:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                await f.write(chunk)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+    return temp_path, hasher.hexdigest()
+
+def parsed_cache_key(resume_hash: str) -> str:
+    """Cache key of a resume's parsed text, tied to the parser version that produced it"""
+    return f"parsed:{PARSER_VERSION}:{resume_hash}"
+
+async def load_resume_cached(resume_hash: str, loader: Callable[[Any], str], source: Any) -> str:
+    """Parse a resume with loader, reusing the cached text for identical content"""
+    cache_key = parsed_cache_key(resume_hash)
+    resume_text = resume_cache.get(cache_key)
+    if resume_text is None:
+        resume_text = await run_in_pdf_pool(loader, source)
+        resume_cache.set(cache_key, resume_text, expire=CACHE_TTL)
+    return resume_text
+
+async def parse_and_preprocess_cached(resume_hash: str, data: bytes) -> Dict:
+    """Parse and preprocess a PDF resume in one pool call, reusing cached results for identical content"""
+    # Preprocessing runs on parsed text, so its entries depend on both versions
+    preproc_key = f"preproc:{PARSER_VERSION}.{PREPROCESS_VERSION}:{resume_hash}"
+    extracted_info = resume_cache.get(preproc_key)
+    if extracted_info is None:
+        resume_text, extracted_info = await run_in_pdf_pool(parse_and_preprocess, data)
+        resume_cache.set(parsed_cache_key(resume_hash), resume_text, expire=CACHE_TTL)
+        resume_cache.set(preproc_key, extracted_info, expire=CACHE_TTL)
+    return extracted_info
+
 @app.post("/upload-resume/")
 async def upload_resume(file: UploadFile = File(...)):
     """Upload and process a single resume"""
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
-
-        # Process resume
-        resume_text = resume_processor.load_resume(temp_path)
-        skills = resume_processor.extract_skills(resume_text)
-
-        # Clean up temp file
-        os.unlink(temp_path)
+        # Stream upload to a temporary file
+        temp_path, resume_hash = await save_upload_to_temp(file, os.path.splitext(file.filename or '')[1])
+        try:
+            # Process resume
+            resume_text = await load_resume_cached(resume_hash, ResumeProcessor.load_resume, temp_path)
+            # Skill extraction may call the LLM, which blocks while rate limited
+            skills = await asyncio.to_thread(resume_processor.extract_skills, resume_text)
+        finally:
+            # Clean up temp file
+            os.unlink(temp_path)
 
         return {
             "filename": file.filename,
@@ -105,6 +193,96 @@ async def upload_resume(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+async def _pipeline_stage(name: str, in_q: asyncio.Queue, out_q: Optional[asyncio.Queue], handler):
+    """Consume items from in_q, pass them through handler and forward results to out_q"""
+    while True:
+        resume, payload = await in_q.get()
+        try:
+            result = await handler(resume, payload)
+            if out_q is not None:
+                await out_q.put((resume, result))
+        except Exception as stage_error:
+            logging.error(f"Error in {name} stage for resume {resume['name']}: {str(stage_error)}")
+        finally:
+            in_q.task_done()
+
+async def run_screening_pipeline(resumes: List[Dict], requirements: Dict) -> List[Dict]:
+    """Download and preprocess resumes as overlapping stages, then analyze them as a batch.
+
+    Downloads overlap with parsing and preprocessing, which run together in
+    the process pool; once every resume is preprocessed the LLM analyses are
+    issued concurrently in a single batch, for the resumes that pass the
+    embedding prefilter. Resumes that fail to download or preprocess are
+    logged and dropped.
+    """
+    download_q: asyncio.Queue = asyncio.Queue()
+    preprocess_q: asyncio.Queue = asyncio.Queue()
+    preprocessed_resumes = []
+
+    async def download(resume: Dict, _) -> Tuple[str, bytes]:
+        # Download into memory, hashing chunks as they arrive. The listing entry
+        # already carries the file's metadata, so no per-file metadata request is made
+        sink = HashingWriter()
+        await asyncio.to_thread(drive_connector.download_resume, resume['id'], sink, resume)
+        return sink.hexdigest(), sink.getvalue()
+
+    async def preprocess(resume: Dict, downloaded: Tuple[str, bytes]) -> None:
+        # Phase 1: PDF parsing and NLP preprocessing, straight from the downloaded bytes
+        resume_hash, data = downloaded
+        extracted_info = await parse_and_preprocess_cached(resume_hash, data)
+        preprocessed_resumes.append((resume, extracted_info))
+
+    for resume in resumes:
+        download_q.put_nowait((resume, None))
+
+    workers = (
+        [asyncio.create_task(_pipeline_stage('download', download_q, preprocess_q, download))
+         for _ in range(DOWNLOAD_WORKERS)] +
+        [asyncio.create_task(_pipeline_stage('preprocess', preprocess_q, None, preprocess))
+         for _ in range(PREPROCESS_WORKERS)]
+    )
+    try:
+        # Each stage only receives work from the one before it, so joining in order drains the pipeline
+        await download_q.join()
+        await preprocess_q.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    if not preprocessed_resumes:
+        return []
+
+    # Phase 2: LLM Analysis against requirements prepared once. An embedding
+    # prefilter picks which resumes are worth an LLM call; those are issued as
+    # one concurrent batch and the rest are scored from extracted skills
+    jd_ctx = resume_processor.prepare_requirements(requirements)
+    extracted_infos = [extracted_info for _, extracted_info in preprocessed_resumes]
+    selected = await asyncio.to_thread(resume_processor.select_for_analysis, extracted_infos, jd_ctx)
+    analyzed = iter(await resume_processor.analyze_batch(
+        [info for info, keep in zip(extracted_infos, selected) if keep],
+        jd_ctx,
+        max_concurrency=ANALYZE_CONCURRENCY
+    ))
+    analysis_results = [
+        next(analyzed) if keep else resume_processor.score_without_llm(info, jd_ctx)
+        for info, keep in zip(extracted_infos, selected)
+    ]
+
+    return [
+        {
+            'name': resume['name'],
+            'matching_skills': analysis_result.get('matching_skills', []),
+            'missing_skills': analysis_result.get('missing_skills', []),
+            'experience_match': analysis_result.get('experience_match', 0.0),
+            'education_match': analysis_result.get('education_match', 0.0),
+            'overall_score': analysis_result.get('overall_score', 0.0),
+            'reasoning': analysis_result.get('reasoning', 'Analysis failed'),
+            'preprocessed_info': analysis_result.get('preprocessed_info', {})
+        }
+        for (resume, _), analysis_result in zip(preprocessed_resumes, analysis_results)
+    ]
+
 @app.post("/screen-resumes/")
 async def screen_resumes(
     folder_id: str = Query(..., description="Google Drive folder ID containing resumes"),
@@ -124,40 +302,9 @@ async def screen_resumes(
         if not resumes:
             raise HTTPException(status_code=404, detail="No resumes found in folder")
         
-        candidates = []
-        for resume in resumes:
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                    drive_connector.download_resume(resume['id'], temp_file.name)
-                    resume_text = resume_processor.load_resume(temp_file.name)
-                    
-                    # Phase 1: NLP Preprocessing
-                    extracted_info = resume_processor.preprocess_resume(resume_text)
-                    
-                    # Phase 2: LLM Analysis
-                    analysis_result = resume_processor.analyze_resume(
-                        extracted_info,
-                        requirements.dict()
-                    )
-                    
-                    candidates.append({
-                        'name': resume['name'],
-                        'matching_skills': analysis_result.get('matching_skills', []),
-                        'missing_skills': analysis_result.get('missing_skills', []),
-                        'experience_match': analysis_result.get('experience_match', 0.0),
-                        'education_match': analysis_result.get('education_match', 0.0),
-                        'overall_score': analysis_result.get('overall_score', 0.0),
-                        'reasoning': analysis_result.get('reasoning', 'Analysis failed'),
-                        'preprocessed_info': analysis_result.get('preprocessed_info', {})
-                    })
-                    
-                    # Cleanup temp file
-                    if os.path.exists(temp_file.name):
-                        os.remove(temp_file.name)
-                        
-            except Exception as resume_error:
-                logging.error(f"Error handling resume {resume['name']}: {str(resume_error)}")
-                continue
+        # Convert the requirements model once and share the dict across all stages
+        requirements_dict = requirements.model_dump()
+        candidates = await run_screening_pipeline(resumes, requirements_dict)
 
         if not candidates:
             raise HTTPException(
@@ -169,7 +316,7 @@ async def screen_resumes(
         try:
             ranked_candidates = await ranking_engine.rank_candidates(
                 candidates,
-                requirements.dict()
+                requirements_dict
             )
         except Exception as rank_error:
             logging.error(f"Error in ranking candidates: {str(rank_error)}")
@@ -201,6 +348,8 @@ async def screen_resumes(
 
 @app.post("/screen-resume/")
 async def screen_resume(
+    request: Request,
+    response: Response,
     file: UploadFile = File(...),
     requirements: UploadFile = File(...)
 ) -> ResumeScreeningResponse:
@@ -216,29 +365,36 @@ async def screen_resume(
         # Read and parse requirements
         requirements_data = await requirements.read()
         try:
-            job_requirements = json.loads(requirements_data)
-        except json.JSONDecodeError:
+            job_requirements = orjson.loads(requirements_data)
+        except orjson.JSONDecodeError:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid JSON in requirements file"
             )
             
-        # Create temporary file with unique name
-        temp_path = tempfile.mktemp(suffix='.pdf')
+        # Stream resume to a temporary file with unique name
+        temp_path, resume_hash = await save_upload_to_temp(file, '.pdf')
         try:
-            # Process resume
-            async with aiofiles.open(temp_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
-                
+            # Identical resume + requirements pairs reuse the previous screening result
+            requirements_hash = content_hash(orjson.dumps(job_requirements, option=orjson.OPT_SORT_KEYS))
+            etag = f'"{resume_hash}:{requirements_hash}"'
+            # The ETag only names a result while it is still cached here
+            if etag in screening_response_cache and request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag})
+
+            cached_result = screening_response_cache.get(etag)
+            if cached_result is not None:
+                response.headers["ETag"] = etag
+                return cached_result.model_copy(update={'name': file.filename})
+
             # Process the resume
-            resume_text = resume_processor.load_resume(temp_path)
-            match_score = resume_processor.calculate_match_score(
+            resume_text = await load_resume_cached(resume_hash, ResumeProcessor.load_resume, temp_path)
+            match_score = await resume_processor.calculate_match_score(
                 resume_text,
                 job_requirements
             )
             
-            return ResumeScreeningResponse(
+            result = ResumeScreeningResponse(
                 name=file.filename,
                 match_score=match_score.get('match_percentage', 0.0),
                 matching_skills=match_score.get('matching_skills', []),
@@ -246,6 +402,11 @@ async def screen_resume(
                 experience_match=match_score.get('experience_match', 0.0),
                 education_match=match_score.get('education_match', 0.0)
             )
+            # Results with failed chunks are partly default scores; recompute them next time
+            if match_score.get('failed_chunks', 0) == 0:
+                screening_response_cache[etag] = result
+                response.headers["ETag"] = etag
+            return result
             
         finally:
             # Clean up temp file
@@ -263,4 +424,13 @@ async def health_check():
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run("backend:app", host="0.0.0.0", port=8000, reload=True)  # Changed from api:app to backend:app
\ No newline at end of file
+    # Each worker owns a PDF process pool sized to the CPU count, so extra
+    # workers are opt-in through uvicorn's WEB_CONCURRENCY variable
+    uvicorn.run(
+        "backend:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=False,  # Reloading drops module-level caches and pools
+        loop="auto",  # uvloop where installed; it is not available on Windows
+        http="httptools"
+    )
\ No newline at end of file
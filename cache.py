@@ -0,0 +1,49 @@
+import hashlib
+import os
+from typing import List
+from diskcache import Cache
+
+# Persistent cache for parsed resume text, preprocessing, LLM and embedding results
+CACHE_DIR = os.getenv("ATS_CACHE_DIR", ".cache/ats")
+CACHE_TTL = 30 * 86400  # 30 days
+
+resume_cache = Cache(CACHE_DIR)
+
+def new_content_hasher():
+    """Create an incremental hasher for resume content keys"""
+    return hashlib.blake2b(digest_size=16)
+
+def content_hash(data: bytes) -> str:
+    """Hash resume bytes into a cache key"""
+    hasher = new_content_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+def cache_key(namespace: str, *parts: str) -> str:
+    """Build a cache key from the text, model and prompt version a result depends on"""
+    hasher = new_content_hasher()
+    for part in parts:
+        hasher.update(part.encode('utf-8'))
+        hasher.update(b'\0')
+    return f"{namespace}:{hasher.hexdigest()}"
+
+class HashingWriter:
+    """Binary sink that hashes and collects bytes as they are written.
+
+    Lets a download be hashed chunk by chunk while it streams in, instead
+    of re-reading the finished buffer.
+    """
+    def __init__(self):
+        self._hasher = new_content_hasher()
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._hasher.update(data)
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+    def getvalue(self) -> bytes:
+        return b''.join(self._chunks)
@@ -0,0 +1,13 @@
+import os
+
+# Import backend (and load the embedding model) once in the master process;
+# forked workers share those pages copy-on-write instead of each loading a copy
+preload_app = True
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+bind = "0.0.0.0:8000"
+
+def pre_fork(server, worker):
+    """Don't hand the master's SQLite cache connection to forked workers"""
+    from cache import resume_cache
+    resume_cache.close()
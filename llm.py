@@ -0,0 +1,67 @@
+import os
+from functools import lru_cache
+import groq
+from groq import Groq, AsyncGroq
+import backoff
+import httpx
+from dotenv import load_dotenv
+from utils import GroqRateLimiter
+
+load_dotenv()
+
+# Account-wide Groq limits shared by every LLM call in this process, sync or async
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_MAX_CONCURRENCY = 8
+# Groq errors worth retrying with exponential backoff, for at most GROQ_RETRY_SECONDS
+GROQ_RETRY_ERRORS = (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)
+GROQ_RETRY_SECONDS = 60
+GROQ_TIMEOUT = httpx.Timeout(60.0)
+
+groq_limiter = GroqRateLimiter(GROQ_REQUESTS_PER_MINUTE, GROQ_MAX_CONCURRENCY)
+
+# Clients are created on first use, so a preloading server (gunicorn --preload)
+# doesn't fork open connection pools into its workers. Retries are handled by
+# backoff around each call, not inside the clients
+@lru_cache(maxsize=None)
+def get_client() -> Groq:
+    """Return the process-wide synchronous Groq client"""
+    return Groq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        max_retries=0,
+        timeout=GROQ_TIMEOUT,
+        http_client=httpx.Client(http2=True, timeout=GROQ_TIMEOUT)
+    )
+
+@lru_cache(maxsize=None)
+def get_async_client() -> AsyncGroq:
+    """Return the process-wide async Groq client, keeping connections warm across calls"""
+    return AsyncGroq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        max_retries=0,
+        timeout=GROQ_TIMEOUT,
+        http_client=httpx.AsyncClient(
+            http2=True,
+            timeout=GROQ_TIMEOUT,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+    )
+
+@backoff.on_exception(
+    backoff.expo, GROQ_RETRY_ERRORS, max_time=GROQ_RETRY_SECONDS, jitter=backoff.full_jitter
+)
+def chat_completion(**params):
+    """Create a Groq chat completion within the rate limit, retrying transient errors.
+
+    This blocks while waiting for the rate limit or a retry; async code
+    should use chat_completion_async or run it in a thread.
+    """
+    groq_limiter.wait()
+    return get_client().chat.completions.create(**params)
+
+@backoff.on_exception(
+    backoff.expo, GROQ_RETRY_ERRORS, max_time=GROQ_RETRY_SECONDS, jitter=backoff.full_jitter
+)
+async def chat_completion_async(**params):
+    """Async variant of chat_completion, drawing on the same request budget"""
+    async with groq_limiter:
+        return await get_async_client().chat.completions.create(**params)
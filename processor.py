@@ -1,19 +1,180 @@
 import os
-import json
+import orjson
 import logging
 import re
-from typing import Dict, List
-from groq import Groq
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import asyncio
+import platform
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Iterable, Iterator, Tuple, Union
+import fitz  # PyMuPDF
+import docx
+import numpy as np
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
-from langchain_groq.chat_models import ChatGroq  # Updated import
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_core.documents import Document
+import faiss
+
+try:
+    import hyperscan
+except ImportError:  # Hyperscan only ships for x86-64; other hosts use the regex scanner
+    hyperscan = None
 from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
 from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import CommaSeparatedListOutputParser
+from utils import match_skills
+from llm import chat_completion, chat_completion_async
+from cache import resume_cache, cache_key, CACHE_TTL
+
+# Sentence embedding model, run through ONNX Runtime with the int8 weights
+# published alongside it (pick the variant matching the host CPU)
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_ONNX_FILE = os.getenv(
+    "EMBEDDING_ONNX_FILE",
+    "onnx/model_qint8_arm64.onnx"
+    if platform.machine().lower() in ("arm64", "aarch64")
+    else "onnx/model_qint8_avx512_vnni.onnx"
+)
+
+# Models and prompt versions that cached LLM results depend on; bump a
+# version when its prompt changes so stale cache entries are ignored
+SKILLS_MODEL = "llama2-70b-4096"
+SKILLS_PROMPT_VERSION = "1"
+CHUNK_MODEL = "llama2-70b-4096"
+CHUNK_PROMPT_VERSION = "1"
+# Versions of resume parsing (load_resume) and preprocessing (preprocess_resume)
+# output cached by content hash; bump one whenever its output changes
+PARSER_VERSION = "2"
+PREPROCESS_VERSION = "2"
+
+# Maximum number of chunk analysis requests in flight at once
+CHUNK_CONCURRENCY = 4
+# Context window of CHUNK_MODEL, shared by a request's prompt and its completion
+CHUNK_MODEL_CONTEXT = 4096
+# Rough tokens of a chunk analysis prompt besides the resume text and requirements
+CHUNK_PROMPT_TOKENS = 300
+# Completion tokens allowed for each chunk's result in a batched request
+CHUNK_RESULT_TOKENS = 200
+
+# Resume chunks are packed up to this many tokens (about 4 characters each),
+# repeating the tail of the previous chunk of the same section as overlap
+CHUNK_TOKEN_LIMIT = 512
+CHUNK_TOKEN_OVERLAP = 64
+
+# Vector stores larger than this use an approximate HNSW index instead of exact search
+HNSW_MIN_VECTORS = 100_000
+
+# Only the most similar fraction of a batch is sent to the LLM; small batches skip the prefilter
+PREFILTER_KEEP_FRACTION = 0.3
+PREFILTER_MIN_RESUMES = 10
+
+# Shared Groq completion settings for resume analysis
+ANALYSIS_COMPLETION_PARAMS = {
+    "model": "mistral-saba-24b",
+    "temperature": 0.1,
+    "max_tokens": 3000,
+    "response_format": {"type": "json_object"},  # Force JSON response
+}
+
+# Resume section headers, each capturing the body up to the next blank line
+SECTION_PATTERNS = {
+    section: re.compile(pattern, re.IGNORECASE | re.DOTALL)
+    for section, pattern in {
+        'summary': r'(summary|profile|objective).*?\n(.*?)(?=\n\n|\Z)',
+        'experience': r'(experience|work\s+experience|employment).*?\n(.*?)(?=\n\n|\Z)',
+        'education': r'(education|academic|qualification).*?\n(.*?)(?=\n\n|\Z)',
+        'skills': r'(skills|technical skills|technologies).*?\n(.*?)(?=\n\n|\Z)'
+    }.items()
+}
+
+# A section keyword opening a paragraph, either followed by a colon or on a
+# short line of its own; lastgroup names the section. Only the keyword and the
+# colon are consumed, so an inline list ("Skills: Python, SQL") stays after it
+SECTION_HEADER_PATTERN = re.compile(
+    r'\s*(?:(?P<summary>summary|profile|objective)'
+    r'|(?P<experience>experience|work\s+experience|employment)'
+    r'|(?P<education>education|academic|qualification)'
+    r'|(?P<skills>skills|technical skills|technologies))\b'
+    r'(?:[ \t]*:|(?=[^\n]{0,40}(?:\n|\Z)))',
+    re.IGNORECASE
+)
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# Job entry: title, company and period lines, then description lines up to a
+# blank line. Matches are only attempted at line starts, so a long line is
+# scanned once rather than again from each of its characters
+EXPERIENCE_PATTERN = re.compile(
+    r'^(?P<title>[^\n]+)\n(?P<company>[^\n]*)\n(?P<period>[^\n]*)\n'
+    r'(?P<description>[^\n]*(?:\n[^\n]+)*)',
+    re.MULTILINE
+)
+
+# Separators between entries of a resume's skills section; sections listing
+# at least MIN_LISTED_SKILLS entries are used without calling the LLM
+SKILL_LIST_SEPARATOR = re.compile(r'[,\u2022\n;|]+')
+MIN_LISTED_SKILLS = 3
+
+# Known technical skills by canonical name, matched as whole words
+COMMON_SKILLS = {
+    'python': r'python', 'java': r'java', 'javascript': r'javascript',
+    'typescript': r'typescript', 'react': r'react', 'node.js': r'node\.?js',
+    'docker': r'docker', 'kubernetes': r'kubernetes', 'aws': r'aws',
+    'azure': r'azure', 'gcp': r'gcp', 'sql': r'sql', 'nosql': r'nosql',
+    'mongodb': r'mongodb', 'postgresql': r'postgresql', 'mysql': r'mysql',
+    'git': r'git', 'ci/cd': r'ci/cd', 'jenkins': r'jenkins',
+    'machine learning': r'machine\s+learning', 'deep learning': r'deep\s+learning',
+    'ai': r'ai', 'nlp': r'nlp', 'fastapi': r'fastapi', 'django': r'django'
+}
+SKILL_NAMES = list(COMMON_SKILLS)
+
+# Single-pass regex fallback: one capture group per skill, in SKILL_NAMES order.
+# ASCII word boundaries, like Hyperscan's, so both backends find the same skills
+SKILLS_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(f'({pattern})' for pattern in COMMON_SKILLS.values()) + r')\b',
+    re.IGNORECASE | re.ASCII
+)
+
+def _compile_skills_database():
+    """Compile all skill patterns into one Hyperscan database, with ids matching SKILL_NAMES"""
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[rf'\b{pattern}\b'.encode() for pattern in COMMON_SKILLS.values()],
+        ids=list(range(len(COMMON_SKILLS))),
+        elements=len(COMMON_SKILLS),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(COMMON_SKILLS)
+    )
+    return database
+
+SKILLS_DATABASE = _compile_skills_database() if hyperscan is not None else None
+
+def _load_pdf(file_path: str) -> str:
+    """Extract text from a PDF with PyMuPDF"""
+    with fitz.open(file_path) as doc:
+        return ' '.join(page.get_text("text") for page in doc)
+
+def _load_docx(file_path: str) -> str:
+    """Extract paragraph text from a Word document"""
+    return '\n'.join(paragraph.text for paragraph in docx.Document(file_path).paragraphs)
+
+# Text extractors by file extension
+RESUME_LOADERS = {
+    '.pdf': _load_pdf,
+    '.docx': _load_docx,
+    '.doc': _load_docx,
+}
+
+@dataclass(frozen=True)
+class PreparedRequirements:
+    """Job requirements preprocessed once and shared across every resume in a batch"""
+    title: str
+    required_skills: Tuple[str, ...]
+    experience: str
+    education: str
+    prompt_section: str  # pre-rendered JOB REQUIREMENTS block of the analysis prompt
+    embedding_text: str  # job description text used for similarity prefiltering
 
 class ResumeProcessor:
     def __init__(self):
@@ -27,39 +188,65 @@ class ResumeProcessor:
             
         # Initialize components
         self.embeddings = HuggingFaceEmbeddings(
-            model_name="all-MiniLM-L6-v2"
+            model_name=EMBEDDING_MODEL,
+            model_kwargs={
+                "backend": "onnx",
+                "model_kwargs": {"file_name": EMBEDDING_ONNX_FILE}
+            },
+            encode_kwargs={"normalize_embeddings": True, "batch_size": 64}
         )
         
-        self.llm = ChatGroq(
-            temperature=0,
-            groq_api_key=self.api_key,
-            model="llama-3.3-70b-versatile",  # Updated model
-        )
-        
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
-        )
-        
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        self.output_parser = CommaSeparatedListOutputParser()
-        
-    def load_resume(self, file_path: str) -> str:
+    def warmup(self) -> None:
+        """Run the local models once so the first request doesn't pay their cold-start cost"""
+        self.embeddings.embed_query("warmup")
+        self.preprocess_resume("Summary\nwarmup\n\nSkills\npython\n")
+        logging.info("Resume processor warmed up")
+
+    # load_resume(_bytes) and preprocess_resume hold no instance state so they can be
+    # dispatched to a process pool without pickling the processor
+    @staticmethod
+    def load_resume(file_path: str) -> str:
         """Load and extract text from resume file"""
         file_extension = os.path.splitext(file_path)[1].lower()
         
-        if (file_extension == '.pdf'):
-            loader = PyPDFLoader(file_path)
-            pages = loader.load_and_split()
-            return ' '.join([page.page_content for page in pages])
-        elif file_extension in ['.docx', '.doc']:
-            loader = Docx2txtLoader(file_path)
-            return loader.load()[0].page_content
-        else:
+        loader = RESUME_LOADERS.get(file_extension)
+        if loader is None:
             raise ValueError(f"Unsupported file format: {file_extension}")
+        return loader(file_path)
+
+    @staticmethod
+    def iter_pages(file_path: str) -> Iterator[str]:
+        """Yield the text of a PDF resume one page at a time"""
+        with fitz.open(file_path) as doc:
+            for page in doc:
+                yield page.get_text("text")
+
+    @staticmethod
+    def load_resume_bytes(data: bytes) -> str:
+        """Extract text from an in-memory PDF resume"""
+        with fitz.open(stream=data, filetype='pdf') as doc:
+            return ' '.join(page.get_text("text") for page in doc)
 
     def extract_skills(self, text: str) -> List[str]:
-        """Extract skills from resume text"""
+        """Extract skills from resume text.
+
+        Resumes with an explicit skills section are split into its entries
+        directly; the LLM is only asked when that yields too few skills.
+        """
+        skills_section = self._skills_section(text)
+        listed_skills = [
+            skill.lower()
+            for skill in map(str.strip, SKILL_LIST_SEPARATOR.split(skills_section))
+            if 1 < len(skill) < 40
+        ]
+        if len(listed_skills) >= MIN_LISTED_SKILLS:
+            return listed_skills
+
+        key = cache_key("skills", text, SKILLS_MODEL, SKILLS_PROMPT_VERSION)
+        cached_skills = resume_cache.get(key)
+        if cached_skills is not None:
+            return cached_skills
+
         try:
             # Create prompt for skill extraction
             messages = [
@@ -68,8 +255,8 @@ class ResumeProcessor:
             ]
             
             # Call Groq API
-            response = self.client.chat.completions.create(
-                model="llama2-70b-4096",
+            response = chat_completion(
+                model=SKILLS_MODEL,
                 messages=messages,
                 temperature=0.1,
                 max_tokens=1000
@@ -83,27 +270,67 @@ class ResumeProcessor:
                 if skill.strip()
             ]
             
-            logging.debug(f"Extracted {len(skills)} skills from resume")
+            logging.debug("Extracted %d skills from resume", len(skills))
+            resume_cache.set(key, skills, expire=CACHE_TTL)
             return skills
             
         except Exception as e:
             logging.error(f"Error extracting skills: {str(e)}")
             return []
 
-    def calculate_match_score(self, resume_text: str, requirements: dict) -> dict:
+    async def calculate_match_score(self, resume_text: Union[str, Iterable[str]], requirements: dict) -> dict:
+        """Score a resume against requirements chunk by chunk.
+
+        resume_text may be the full text or an iterable of page texts (see
+        iter_pages), which is chunked as it is read. failed_chunks in the
+        result counts chunks whose analysis failed and contributed nothing.
+        """
         try:
-            # Split long text into chunks
-            chunks = chunk_text(resume_text)
+            # Split text into section-aware chunks
+            chunks = self._heuristic_chunks(resume_text)
             
-            # Process each chunk separately
+            # Send chunks in token-budgeted batches, processed concurrently but
+            # bounded to stay within Groq rate limits
+            semaphore = asyncio.Semaphore(CHUNK_CONCURRENCY)
+
+            async def process(batch: List[str]) -> List[dict]:
+                async with semaphore:
+                    return await self._process_chunks_batch(batch, requirements)
+
+            # Reuse cached analyses of identical chunks; only the rest go to the LLM
+            results = []
+            uncached_chunks = []
+            for chunk in chunks:
+                cached_result = resume_cache.get(self._chunk_cache_key(chunk, requirements))
+                if cached_result is not None:
+                    results.append(cached_result)
+                else:
+                    uncached_chunks.append(chunk)
+
+            batch_results = await asyncio.gather(
+                *(process(batch) for batch in self._batch_chunks(
+                    uncached_chunks, self._batch_token_budget(requirements)
+                )),
+                return_exceptions=True
+            )
+            for batch_result in batch_results:
+                if isinstance(batch_result, Exception):
+                    results.append(batch_result)
+                else:
+                    results.extend(batch_result)
+
             all_skills = set()
             max_experience_match = 0
             max_education_match = 0
+            failed_chunks = 0
             
-            for chunk in chunks:
+            for result in results:
                 try:
-                    # Process chunk with LLM
-                    result = self._process_chunk(chunk, requirements)
+                    if isinstance(result, Exception):
+                        raise result
+                    if result.get('failed'):
+                        failed_chunks += 1
+                        continue
                     
                     # Aggregate skills
                     all_skills.update(result.get('matching_skills', []))
@@ -120,24 +347,125 @@ class ResumeProcessor:
                     
                 except Exception as chunk_error:
                     logging.warning(f"Error processing chunk: {str(chunk_error)}")
+                    failed_chunks += 1
                     continue
             
-            # Calculate missing skills
-            required_skills = set(requirements['required_skills'])
-            missing_skills = required_skills - all_skills
+            # Map found skills onto the required skills they fuzzily match
+            matching_skills = match_skills(requirements['required_skills'], all_skills)
+            missing_skills = [
+                skill for skill in requirements['required_skills']
+                if skill not in matching_skills
+            ]
             
             return {
-                'matching_skills': list(all_skills),
-                'missing_skills': list(missing_skills),
+                'matching_skills': matching_skills,
+                'missing_skills': missing_skills,
                 'experience_match': max_experience_match,
-                'education_match': max_education_match
+                'education_match': max_education_match,
+                'failed_chunks': failed_chunks
             }
             
         except Exception as e:
             logging.error(f"Error in calculate_match_score: {str(e)}")
             raise
     
-    def _process_chunk(self, chunk: str, requirements: dict) -> dict:
+    @staticmethod
+    def _chunk_cache_key(chunk: str, requirements: dict) -> str:
+        """Cache key for the analysis of one chunk against a set of requirements"""
+        return cache_key(
+            "chunk",
+            chunk,
+            ', '.join(requirements['required_skills']),
+            requirements['experience'],
+            requirements['education'],
+            CHUNK_MODEL,
+            CHUNK_PROMPT_VERSION
+        )
+
+    @staticmethod
+    def _batch_token_budget(requirements: dict) -> int:
+        """Tokens of a batched chunk request left for chunk text and results (4 chars per token)"""
+        requirements_chars = sum(map(len, [
+            ', '.join(requirements['required_skills']),
+            requirements['experience'],
+            requirements['education']
+        ]))
+        return CHUNK_MODEL_CONTEXT - CHUNK_PROMPT_TOKENS - requirements_chars // 4
+
+    @staticmethod
+    def _batch_chunks(chunks: List[str], token_budget: int) -> List[List[str]]:
+        """Group chunks so each batch's text and results fit in token_budget.
+
+        Every chunk costs its text (4 chars per token) plus CHUNK_RESULT_TOKENS
+        of completion, so a batch's prompt and completion fit the model context.
+        """
+        batches = []
+        current_batch = []
+        current_tokens = 0
+        for chunk in chunks:
+            chunk_tokens = len(chunk) // 4 + CHUNK_RESULT_TOKENS
+            if current_batch and current_tokens + chunk_tokens > token_budget:
+                batches.append(current_batch)
+                current_batch = []
+                current_tokens = 0
+            current_batch.append(chunk)
+            current_tokens += chunk_tokens
+        if current_batch:
+            batches.append(current_batch)
+        return batches
+
+    async def _process_chunks_batch(self, chunks: List[str], requirements: dict) -> List[dict]:
+        """Analyze several chunks in one LLM call, falling back to one call per chunk"""
+        if len(chunks) == 1:
+            return [await self._process_chunk(chunks[0], requirements)]
+
+        try:
+            messages = [
+                {"role": "system", "content": "You are an AI assistant analyzing resume content. Return only valid JSON."},
+                {"role": "user", "content": f"""
+                Analyze each of these resume sections against the requirements:
+                
+                RESUME SECTIONS:
+                {orjson.dumps([{"id": i, "text": chunk} for i, chunk in enumerate(chunks)]).decode()}
+                
+                REQUIREMENTS:
+                - Skills: {', '.join(requirements['required_skills'])}
+                - Experience: {requirements['experience']}
+                - Education: {requirements['education']}
+                
+                Return a JSON object {{"results": [...]}} with one entry per section, each with:
+                - id: the section id
+                - matching_skills: list of found skills that match requirements
+                - missing_skills: list of required skills not found
+                - experience_match: score from 0.0 to 1.0
+                - education_match: score from 0.0 to 1.0
+                """}
+            ]
+            
+            response = await chat_completion_async(
+                model=CHUNK_MODEL,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=CHUNK_RESULT_TOKENS * len(chunks),
+                response_format={"type": "json_object"}
+            )
+            
+            results_by_id = {
+                int(result['id']): result
+                for result in orjson.loads(response.choices[0].message.content)['results']
+            }
+            results = [results_by_id[i] for i in range(len(chunks))]
+            for chunk, result in zip(chunks, results):
+                resume_cache.set(self._chunk_cache_key(chunk, requirements), result, expire=CACHE_TTL)
+            return results
+            
+        except Exception as e:
+            logging.warning(f"Batched chunk analysis failed, retrying chunks individually: {str(e)}")
+            return list(await asyncio.gather(
+                *(self._process_chunk(chunk, requirements) for chunk in chunks)
+            ))
+
+    async def _process_chunk(self, chunk: str, requirements: dict) -> dict:
         """Process a single chunk of text"""
         try:
             messages = [
@@ -161,14 +489,15 @@ class ResumeProcessor:
                 """}
             ]
             
-            response = self.client.chat.completions.create(
-                model="llama2-70b-4096",
+            response = await chat_completion_async(
+                model=CHUNK_MODEL,
                 messages=messages,
                 temperature=0.1,
                 max_tokens=1000
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
+            resume_cache.set(self._chunk_cache_key(chunk, requirements), result, expire=CACHE_TTL)
             return result
             
         except Exception as e:
@@ -177,29 +506,61 @@ class ResumeProcessor:
                 "matching_skills": [],
                 "missing_skills": requirements['required_skills'],
                 "experience_match": 0.0,
-                "education_match": 0.0
+                "education_match": 0.0,
+                "failed": True  # Default scores, not an analysis; never cached
             }
 
     def create_vector_store(self, resumes: List[str]) -> FAISS:
         """Create a vector store for semantic search"""
-        texts = self.text_splitter.split_text('\n'.join(resumes))
-        return FAISS.from_texts(texts, self.embeddings)
+        texts = [chunk for resume in resumes for chunk in self._heuristic_chunks(resume)]
+
+        # Only embed splits that haven't been embedded by this model before
+        keys = [cache_key("embedding", text, EMBEDDING_MODEL, EMBEDDING_ONNX_FILE) for text in texts]
+        vectors = [resume_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            new_vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, new_vectors):
+                vectors[i] = vector
+                resume_cache.set(keys[i], vector, expire=CACHE_TTL)
+
+        # Build the index directly: cosine similarity as inner product over unit vectors
+        matrix = np.asarray(vectors, dtype='float32')
+        faiss.normalize_L2(matrix)
+        if len(texts) > HNSW_MIN_VECTORS:
+            index = faiss.IndexHNSWFlat(matrix.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexFlatIP(matrix.shape[1])
+        index.add(matrix)
 
-    def preprocess_resume(self, text: str) -> Dict[str, any]:
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore({str(i): Document(page_content=text) for i, text in enumerate(texts)}),
+            index_to_docstore_id={i: str(i) for i in range(len(texts))},
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
+        )
+
+    @classmethod
+    def preprocess_resume(cls, text: str) -> Dict[str, any]:
         """Extract relevant information from resume text"""
         try:
             # Extract sections
-            sections = self._split_into_sections(text)
+            sections = cls._split_into_sections(text)
             
             # Process each section
             extracted_info = {
-                'skills': self._extract_technical_skills(sections.get('skills', '')),
-                'experience': self._extract_experience(sections.get('experience', '')),
+                'skills': cls._extract_technical_skills(sections.get('skills', '')),
+                'experience': cls._extract_experience(sections.get('experience', '')),
                 'education': sections.get('education', ''),
                 'summary': sections.get('summary', '')
             }
             
-            logging.debug(f"Extracted info from resume: {json.dumps(extracted_info, indent=2)}")
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug(
+                    "Extracted info from resume: %s",
+                    orjson.dumps(extracted_info, option=orjson.OPT_INDENT_2).decode()
+                )
             return extracted_info
             
         except Exception as e:
@@ -211,58 +572,107 @@ class ResumeProcessor:
                 'summary': ''
             }
 
-    def _split_into_sections(self, text: str) -> Dict[str, str]:
+    @staticmethod
+    def _split_into_sections(text: str) -> Dict[str, str]:
         """Split resume into sections using regex patterns"""
         sections = {}
         
-        # Define section patterns
-        patterns = {
-            'summary': r'(?i)(summary|profile|objective).*?\n(.*?)(?=\n\n|\Z)',
-            'experience': r'(?i)(experience|work\s+experience|employment).*?\n(.*?)(?=\n\n|\Z)',
-            'education': r'(?i)(education|academic|qualification).*?\n(.*?)(?=\n\n|\Z)',
-            'skills': r'(?i)(skills|technical skills|technologies).*?\n(.*?)(?=\n\n|\Z)'
-        }
-        
-        for section, pattern in patterns.items():
-            matches = re.findall(pattern, text, re.DOTALL)
-            if matches:
-                sections[section] = matches[0][1].strip()
+        for section, pattern in SECTION_PATTERNS.items():
+            match = pattern.search(text)
+            if match:
+                sections[section] = match.group(2).strip()
                 
         return sections
 
-    def _extract_technical_skills(self, text: str) -> List[str]:
-        """Extract technical skills from text"""
-        common_skills = [
-            r'python', r'java\b', r'javascript', r'typescript', r'react', 
-            r'node\.?js', r'docker', r'kubernetes', r'aws', r'azure', 
-            r'gcp', r'sql', r'nosql', r'mongodb', r'postgresql', 
-            r'mysql', r'git', r'ci/cd', r'jenkins', r'machine\s+learning',
-            r'deep\s+learning', r'ai', r'nlp', r'fastapi', r'django'
-        ]
-        
-        skills = set()
-        text = text.lower()
-        
-        # Extract skills using patterns
-        for skill in common_skills:
-            matches = re.finditer(skill, text, re.IGNORECASE)
-            for match in matches:
-                skills.add(match.group(0).strip())
-        
-        return list(skills)
+    @staticmethod
+    def _skills_section(text: str) -> str:
+        """Return the body of a resume's skills section, or '' if no line opens one.
+
+        Unlike _split_into_sections this only accepts a header line, so prose
+        such as "strong communication skills" is not taken for the section.
+        """
+        paragraphs = (paragraph.strip() for paragraph in PARAGRAPH_BREAK.split(text))
+        for paragraph in paragraphs:
+            header = SECTION_HEADER_PATTERN.match(paragraph)
+            if header and header.lastgroup == 'skills':
+                line, _, rest = paragraph[header.end():].partition('\n')
+                line, rest = line.strip(' \t:-'), rest.strip()
+                if not line:
+                    # A header standing alone introduces the lines, or paragraph, after it
+                    return rest or next(paragraphs, '')
+                # Text after "Skills:" is the list itself; without a colon the
+                # line is a longer title ("Skills & Tools") when lines follow
+                return rest if rest and not header.group().endswith(':') else line
+        return ''
+
+    @staticmethod
+    def _heuristic_chunks(
+        text: Union[str, Iterable[str]],
+        max_tokens: int = CHUNK_TOKEN_LIMIT,
+        overlap_tokens: int = CHUNK_TOKEN_OVERLAP
+    ) -> List[str]:
+        """Chunk resume text along section and paragraph boundaries.
+
+        Paragraphs are packed greedily into chunks of about max_tokens, each
+        prefixed with the name of the section it came from so it carries
+        context on its own. A chunk continuing a section starts with the last
+        overlap_tokens of the one before it. text may also be an iterable of
+        pages, consumed lazily; paragraphs never span a page break.
+        """
+        pages = [text] if isinstance(text, str) else text
+        max_chars = max_tokens * 4
+        overlap_chars = overlap_tokens * 4
+        piece_chars = max_chars - overlap_chars
+        chunks = []
+        section = 'resume'
+        body = ''
+
+        for paragraph in itertools.chain.from_iterable(map(PARAGRAPH_BREAK.split, pages)):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+
+            header = SECTION_HEADER_PATTERN.match(paragraph)
+            if header and header.lastgroup != section:
+                if body:
+                    chunks.append(f"[{section}]\n{body}")
+                section, body = header.lastgroup, ''
+
+            # Paragraphs longer than a chunk are cut into fixed-size pieces
+            for start in range(0, len(paragraph), piece_chars):
+                piece = paragraph[start:start + piece_chars]
+                if body and len(body) + len(piece) + 2 > max_chars:
+                    chunks.append(f"[{section}]\n{body}")
+                    body = body[-overlap_chars:] if overlap_chars else ''
+                body = f"{body}\n\n{piece}" if body else piece
+
+        if body:
+            chunks.append(f"[{section}]\n{body}")
+        return chunks
+
+    @staticmethod
+    def _extract_technical_skills(text: str) -> List[str]:
+        """Extract technical skills from text in a single pass"""
+        if SKILLS_DATABASE is not None:
+            found = set()
+
+            def on_match(skill_id, start, end, flags, context):
+                found.add(skill_id)
+
+            SKILLS_DATABASE.scan(text.encode('utf-8'), match_event_handler=on_match)
+            return [SKILL_NAMES[skill_id] for skill_id in sorted(found)]
 
-    def _extract_experience(self, text: str) -> List[Dict]:
+        # Skill id order, like the Hyperscan path, so both backends return the same list
+        found = {match.lastindex - 1 for match in SKILLS_PATTERN.finditer(text)}
+        return [SKILL_NAMES[skill_id] for skill_id in sorted(found)]
+
+    @staticmethod
+    def _extract_experience(text: str) -> List[Dict]:
         """Extract work experience details"""
         experiences = []
         
         # Match job entries
-        job_entries = re.finditer(
-            r'(?i)(?P<title>.*?)\n(?P<company>.*?)\n(?P<period>.*?)\n(?P<description>.*?)(?=\n\n|\Z)',
-            text,
-            re.DOTALL
-        )
-        
-        for entry in job_entries:
+        for entry in EXPERIENCE_PATTERN.finditer(text):
             experiences.append({
                 'title': entry.group('title').strip(),
                 'company': entry.group('company').strip(),
@@ -272,67 +682,177 @@ class ResumeProcessor:
             
         return experiences
 
-    def analyze_resume(self, extracted_info: Dict, requirements: Dict) -> Dict:
+    @staticmethod
+    def prepare_requirements(requirements: Dict) -> PreparedRequirements:
+        """Preprocess job requirements once so they can be reused across a batch of resumes"""
+        required_skills = tuple(requirements['required_skills'])
+        return PreparedRequirements(
+            title=requirements['title'],
+            required_skills=required_skills,
+            experience=requirements['experience'],
+            education=requirements['education'],
+            prompt_section=(
+                "JOB REQUIREMENTS:\n"
+                f"        Title: {requirements['title']}\n"
+                f"        Required Skills: {', '.join(required_skills)}\n"
+                f"        Required Experience: {requirements['experience']}\n"
+                f"        Required Education: {requirements['education']}"
+            ),
+            embedding_text='\n'.join(filter(None, [
+                requirements['title'],
+                ', '.join(required_skills),
+                requirements['experience'],
+                requirements['education'],
+                requirements.get('description') or ''
+            ]))
+        )
+
+    def select_for_analysis(
+        self,
+        extracted_infos: List[Dict],
+        jd: PreparedRequirements,
+        keep_fraction: float = PREFILTER_KEEP_FRACTION
+    ) -> List[bool]:
+        """Flag the resumes most similar to the job description for full LLM analysis"""
+        if len(extracted_infos) < PREFILTER_MIN_RESUMES:
+            return [True] * len(extracted_infos)
+
+        # Embeddings are normalized, so a dot product is the cosine similarity
+        jd_vec = np.asarray(self.embeddings.embed_query(jd.embedding_text))
+        resume_mat = np.asarray(self.embeddings.embed_documents(
+            [self._embedding_text(info) for info in extracted_infos]
+        ))
+        scores = resume_mat @ jd_vec
+        threshold = np.quantile(scores, 1 - keep_fraction)
+
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Prefilter kept %d of %d resumes", int((scores >= threshold).sum()), len(scores))
+        return (scores >= threshold).tolist()
+
+    def score_without_llm(self, extracted_info: Dict, jd: PreparedRequirements) -> Dict:
+        """Score a resume from its extracted skills alone, for resumes skipped by the prefilter"""
+        matching_skills = match_skills(jd.required_skills, extracted_info.get('skills', []))
+        num_required_skills = len(jd.required_skills)
+        skills_score = len(matching_skills) / num_required_skills if num_required_skills > 0 else 0
+
+        return {
+            'matching_skills': matching_skills,
+            'missing_skills': [skill for skill in jd.required_skills if skill not in matching_skills],
+            'experience_match': 0.0,
+            'education_match': 0.0,
+            'overall_score': skills_score * 0.5 * 100,  # Skills weight only, as a percentage
+            'reasoning': 'Below the similarity prefilter threshold; scored on extracted skills only',
+            'preprocessed_info': extracted_info
+        }
+
+    @staticmethod
+    def _embedding_text(extracted_info: Dict) -> str:
+        """Build the resume snippet embedded for similarity prefiltering"""
+        titles = [exp.get('title', '') for exp in extracted_info.get('experience', []) if isinstance(exp, dict)]
+        return '\n'.join(filter(None, [
+            ', '.join(extracted_info.get('skills', [])),
+            ', '.join(titles),
+            extracted_info.get('education', ''),
+            extracted_info.get('summary', '')[:500]
+        ]))
+
+    def analyze_resume(self, extracted_info: Dict, jd: PreparedRequirements) -> Dict:
         """Analyze preprocessed resume against requirements using LLM"""
         try:
-            messages = [
-                {
-                    "role": "system",
-                    "content": ("You are a resume analyzer. Return only valid JSON with scores and explanations. "
-                               "Do not include any other text in your response.")
-                },
-                {
-                    "role": "user",
-                    "content": self._create_analysis_prompt(extracted_info, requirements)
-                }
-            ]
-            
             # Call Groq API with Mistral model
-            response = self.client.chat.completions.create(
-                model="mistral-saba-24b",
-                messages=messages,
-                temperature=0.1,
-                max_tokens=3000,
-                response_format={"type": "json_object"}  # Force JSON response
+            response = chat_completion(
+                messages=self._create_analysis_messages(extracted_info, jd),
+                **ANALYSIS_COMPLETION_PARAMS
             )
-            
-            # Extract and validate JSON response
-            try:
-                content = response.choices[0].message.content.strip()
-                logging.debug(f"Raw LLM response: {content}")
-                
-                # Parse JSON response
-                result = json.loads(content)
-                
-                # Validate required fields
-                required_fields = ['matching_skills', 'missing_skills', 'experience_match', 'education_match', 'reasoning']
-                if not all(field in result for field in required_fields):
-                    raise ValueError("Missing required fields in LLM response")
-                    
-                # Calculate overall score
-                num_required_skills = len(requirements['required_skills'])
-                skills_score = len(result['matching_skills']) / num_required_skills if num_required_skills > 0 else 0
-                
-                result.update({
-                    'overall_score': (
-                        skills_score * 0.5 +  # 50% weight to skills
-                        result['experience_match'] * 0.3 +  # 30% weight to experience
-                        result['education_match'] * 0.2  # 20% weight to education
-                    ) * 100,  # Convert to percentage
-                    'preprocessed_info': extracted_info
-                })
-                
-                return result
-                
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                logging.error(f"Error parsing LLM response: {str(e)}")
-                raise
-                
+            return self._parse_analysis_response(response, extracted_info, jd)
+
+        except Exception as e:
+            logging.error(f"Error in resume analysis: {str(e)}")
+            return self._get_default_scores(jd, extracted_info)
+
+    async def analyze_resume_async(self, extracted_info: Dict, jd: PreparedRequirements) -> Dict:
+        """Async variant of analyze_resume using the shared async Groq client"""
+        try:
+            response = await chat_completion_async(
+                messages=self._create_analysis_messages(extracted_info, jd),
+                **ANALYSIS_COMPLETION_PARAMS
+            )
+            return self._parse_analysis_response(response, extracted_info, jd)
+
         except Exception as e:
             logging.error(f"Error in resume analysis: {str(e)}")
-            return self._get_default_scores(requirements, extracted_info)
+            return self._get_default_scores(jd, extracted_info)
+
+    async def analyze_batch(
+        self,
+        extracted_infos: List[Dict],
+        jd: PreparedRequirements,
+        max_concurrency: int = 8
+    ) -> List[Dict]:
+        """Analyze many preprocessed resumes concurrently, preserving input order"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze_one(extracted_info: Dict) -> Dict:
+            async with semaphore:
+                return await self.analyze_resume_async(extracted_info, jd)
+
+        return await asyncio.gather(*(analyze_one(info) for info in extracted_infos))
 
-    def _create_analysis_prompt(self, extracted_info: Dict, requirements: Dict) -> str:
+    def _create_analysis_messages(self, extracted_info: Dict, jd: PreparedRequirements) -> List[Dict]:
+        """Build the chat messages for resume analysis"""
+        return [
+            {
+                "role": "system",
+                "content": ("You are a resume analyzer. Return only valid JSON with scores and explanations. "
+                           "Do not include any other text in your response.")
+            },
+            {
+                "role": "user",
+                "content": self._create_analysis_prompt(extracted_info, jd)
+            }
+        ]
+
+    def _parse_analysis_response(self, response, extracted_info: Dict, jd: PreparedRequirements) -> Dict:
+        """Extract and validate the JSON analysis from an LLM response"""
+        try:
+            content = response.choices[0].message.content.strip()
+            logging.debug("Raw LLM response: %s", content)
+            
+            # Parse JSON response
+            result = orjson.loads(content)
+            
+            # Validate required fields
+            required_fields = ['matching_skills', 'missing_skills', 'experience_match', 'education_match', 'reasoning']
+            if not all(field in result for field in required_fields):
+                raise ValueError("Missing required fields in LLM response")
+
+            # Canonicalize the LLM's skills onto the required skills they fuzzily match
+            result['matching_skills'] = match_skills(jd.required_skills, result['matching_skills'])
+            result['missing_skills'] = [
+                skill for skill in jd.required_skills
+                if skill not in result['matching_skills']
+            ]
+                
+            # Calculate overall score
+            num_required_skills = len(jd.required_skills)
+            skills_score = len(result['matching_skills']) / num_required_skills if num_required_skills > 0 else 0
+            
+            result.update({
+                'overall_score': (
+                    skills_score * 0.5 +  # 50% weight to skills
+                    result['experience_match'] * 0.3 +  # 30% weight to experience
+                    result['education_match'] * 0.2  # 20% weight to education
+                ) * 100,  # Convert to percentage
+                'preprocessed_info': extracted_info
+            })
+            
+            return result
+            
+        except (orjson.JSONDecodeError, KeyError, ValueError) as e:
+            logging.error(f"Error parsing LLM response: {str(e)}")
+            raise
+
+    def _create_analysis_prompt(self, extracted_info: Dict, jd: PreparedRequirements) -> str:
         """Create prompt for LLM analysis"""
         return f"""
         Analyze this preprocessed resume information against the job requirements and provide detailed scoring:
@@ -341,17 +861,13 @@ class ResumeProcessor:
         Skills Found: {', '.join(extracted_info['skills'])}
         
         Experience Summary:
-        {json.dumps(self._format_experience(extracted_info['experience']), indent=2)}
+        {orjson.dumps(self._format_experience(extracted_info['experience']), option=orjson.OPT_INDENT_2).decode()}
         
         Education: {extracted_info['education']}
         
         Professional Summary: {extracted_info['summary'][:500]}...
 
-        JOB REQUIREMENTS:
-        Title: {requirements['title']}
-        Required Skills: {', '.join(requirements['required_skills'])}
-        Required Experience: {requirements['experience']}
-        Required Education: {requirements['education']}
+        {jd.prompt_section}
 
         Provide analysis in this exact JSON format:
         {{
@@ -379,14 +895,23 @@ class ResumeProcessor:
                 })
         return formatted
 
-    def _get_default_scores(self, requirements: Dict, extracted_info: Dict = None) -> Dict:
+    def _get_default_scores(self, jd: PreparedRequirements, extracted_info: Dict = None) -> Dict:
         """Return default scores when analysis fails"""
         return {
             'matching_skills': [],
-            'missing_skills': requirements['required_skills'],
+            'missing_skills': list(jd.required_skills),
             'experience_match': 0.0,
             'education_match': 0.0,
             'overall_score': 0.0,
             'reasoning': 'Failed to analyze resume',
             'preprocessed_info': extracted_info or {}
-        }
\ No newline at end of file
+        }
+
+def parse_and_preprocess(data: bytes) -> Tuple[str, Dict]:
+    """Parse an in-memory PDF resume and preprocess its text in one step.
+
+    A module-level function so a process pool can run both CPU-bound stages
+    for a resume in a single round trip.
+    """
+    resume_text = ResumeProcessor.load_resume_bytes(data)
+    return resume_text, ResumeProcessor.preprocess_resume(resume_text)
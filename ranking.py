@@ -1,20 +1,16 @@
 from typing import List, Dict
 from dataclasses import dataclass
-import json
-import os
+import orjson
 import logging
 import asyncio
+import numpy as np
 from dotenv import load_dotenv
-from groq import Groq
 
 # Remove unused imports
 # from langchain_groq import ChatGroq
 # from langchain.chains import LLMChain
 # from langchain.prompts import PromptTemplate
-# import numpy as np
-from utils import rate_limit
-import backoff
-import httpx
+from llm import chat_completion
 
 @dataclass
 class RankedCandidate:
@@ -26,46 +22,48 @@ class RankedCandidate:
     education_match: float
 
 class RankingEngine:
-    def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        
     async def rank_candidates(self, candidates: List[dict], requirements: dict) -> List[dict]:
         """Rank candidates based on their match scores"""
         try:
-            # Calculate overall score for each candidate
-            for candidate in candidates:
-                # Calculate percentage scores
-                total_required = len(requirements['required_skills'])
-                if total_required > 0:
-                    skills_match = len(candidate.get('matching_skills', [])) / total_required
-                else:
-                    skills_match = 0.0
-                    
-                experience_match = float(candidate.get('experience_match', 0))
-                education_match = float(candidate.get('education_match', 0))
-                
-                # Calculate weighted overall score (0-100 scale)
-                overall_score = (
-                    skills_match * 50 +          # 50% weight to skills
-                    experience_match * 30 +       # 30% weight to experience
-                    education_match * 20          # 20% weight to education
-                )
-                
-                candidate['overall_score'] = overall_score
-                candidate['skills_match'] = skills_match * 100  # Convert to percentage
+            # Gather the per-candidate fields into arrays and score them in one pass
+            count = len(candidates)
+            matching = np.fromiter(
+                (len(c.get('matching_skills', [])) for c in candidates), dtype=np.int32, count=count
+            )
+            missing = np.fromiter(
+                (len(c.get('missing_skills', [])) for c in candidates), dtype=np.int32, count=count
+            )
+            experience_match = np.fromiter(
+                (float(c.get('experience_match', 0)) for c in candidates), dtype=np.float64, count=count
+            )
+            education_match = np.fromiter(
+                (float(c.get('education_match', 0)) for c in candidates), dtype=np.float64, count=count
+            )
+            
+            # Calculate percentage scores
+            total_required = len(requirements['required_skills'])
+            if total_required > 0:
+                skills_match = matching / total_required
+            else:
+                skills_match = np.zeros(count)
             
-            # Sort candidates
-            ranked_candidates = sorted(
-                candidates,
-                key=lambda x: (
-                    x['overall_score'],
-                    len(x.get('matching_skills', [])),
-                    -len(x.get('missing_skills', []))
-                ),
-                reverse=True
+            # Calculate weighted overall score (0-100 scale)
+            overall_score = (
+                skills_match * 50 +          # 50% weight to skills
+                experience_match * 30 +       # 30% weight to experience
+                education_match * 20          # 20% weight to education
             )
             
-            logging.debug(f"Ranked {len(ranked_candidates)} candidates")
+            for candidate, score, skills in zip(candidates, overall_score.tolist(), (skills_match * 100).tolist()):
+                candidate['overall_score'] = score
+                candidate['skills_match'] = skills  # Convert to percentage
+            
+            # Sort candidates: highest score, then most matching and fewest missing
+            # skills; lexsort is stable and its last key is the primary one
+            order = np.lexsort((missing, -matching, -overall_score))
+            ranked_candidates = [candidates[i] for i in order]
+            
+            logging.debug("Ranked %d candidates", len(ranked_candidates))
             return ranked_candidates
             
         except Exception as e:
@@ -76,14 +74,18 @@ class RankingEngine:
         try:
             prompt = self._create_analysis_prompt(resume_text, requirements)
             
-            response = self.client.completions.create(
+            response = chat_completion(
                 model="mistral-saba-24b",
-                prompt=prompt,
+                messages=[
+                    {"role": "system", "content": "You are a resume analyzer. Return only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.1,
-                max_tokens=1000
+                max_tokens=1000,
+                response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].text.strip())
+            result = orjson.loads(response.choices[0].message.content.strip())
             return self._normalize_scores(result, requirements)
             
         except Exception as e:
@@ -114,29 +116,33 @@ class RankingEngine:
     
     def _normalize_scores(self, result: dict, requirements: dict) -> dict:
         try:
-            logging.debug(f"Parsed LLM response: {result}")
+            logging.debug("Parsed LLM response: %s", result)
+            
+            # Lowercase the requirements once so each membership check is O(1)
+            required_skills = [s.lower() for s in requirements['required_skills']]
+            required_lower = set(required_skills)
             
             # Normalize and validate scores
             normalized = {
                 'matching_skills': [
-                    skill.lower() for skill in result.get('matching_skills', [])
-                    if skill.lower() in [s.lower() for s in requirements['required_skills']]
+                    skill for skill in (s.lower() for s in result.get('matching_skills', []))
+                    if skill in required_lower
                 ],
                 'experience_match': min(max(float(result.get('experience_match', 0)), 0), 1),
                 'education_match': min(max(float(result.get('education_match', 0)), 0), 1)
             }
             
-            # Calculate missing skills
-            required_skills = [s.lower() for s in requirements['required_skills']]
+            # Calculate missing skills, in the order they were required
+            matched = set(normalized['matching_skills'])
             normalized['missing_skills'] = [
                 skill for skill in required_skills 
-                if skill not in [s.lower() for s in normalized['matching_skills']]
+                if skill not in matched
             ]
             
-            logging.info(f"Calculated scores for resume: {normalized}")
+            logging.info("Calculated scores for resume: %s", normalized)
             return normalized
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logging.error(f"Failed to parse LLM response: {e}")
             return self._get_default_scores(requirements)
     
@@ -2,16 +2,23 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+from googleapiclient.http import MediaIoBaseDownload, build_http
 from googleapiclient.errors import HttpError
-from typing import List, Dict, Optional, Any
+from google_auth_httplib2 import AuthorizedHttp
+from typing import List, Dict, Optional, Any, IO, Union
+import io
 import os
-import pickle
+import re
+import asyncio
+import aiohttp
+import aiofiles
 import json
 import logging
+import threading
+from cache import resume_cache
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; DEBUG output (and the work of formatting it) is opt-in
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Define OAuth 2.0 scopes - use only necessary permissions
@@ -20,23 +27,66 @@ SCOPES = [
     'https://www.googleapis.com/auth/drive.metadata',  # Read and write metadata
     'https://www.googleapis.com/auth/drive',  # Full drive access
 ]
-TOKEN_PATH = 'credentials/token.pickle'
+TOKEN_PATH = 'credentials/token.json'
+
+# Folder ID inside a Drive folder URL, e.g. https://drive.google.com/drive/folders/<id>?usp=sharing
+FOLDER_URL_PATTERN = re.compile(r'folders/([A-Za-z0-9_-]+)')
+
+# Largest page Drive returns for files().list, and the metadata kept for each file
+LIST_PAGE_SIZE = 1000
+FILE_FIELDS = 'id, name, mimeType, size, modifiedTime'
+
+# How long list_resumes_cached reuses a folder listing, in seconds
+DRIVE_LIST_TTL = 300
+
+# Drive accepts at most 100 calls in a single batch request
+METADATA_BATCH_SIZE = 100
+MEDIA_URL = 'https://www.googleapis.com/drive/v3/files/{file_id}?alt=media'
+DOWNLOAD_CONCURRENCY = 8
+# Larger media chunks mean fewer HTTPS round trips per file (the client default is 100KB)
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
 
 class GoogleDriveConnector:
     def __init__(self):
         self.service = None
         self.credentials = None
+        self._local = threading.local()
+        # Metadata of every file seen in a listing, so downloads can skip files().get
+        self._file_metadata: Dict[str, Dict[str, Any]] = {}
+        self._file_metadata_lock = threading.Lock()
+
+    def _remember_metadata(self, files: List[Dict[str, Any]]) -> None:
+        """Keep listed files' metadata for later downloads"""
+        with self._file_metadata_lock:
+            self._file_metadata.update((file['id'], file) for file in files)
+
+    def _thread_http(self) -> AuthorizedHttp:
+        """Return an authorized HTTP transport owned by the calling thread.
+
+        httplib2 is not thread-safe, so requests issued from worker threads
+        must not share the transport bound to ``self.service``.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            # build_http sets the client library's default socket timeout, so a stalled
+            # request fails instead of hanging the worker
+            http = AuthorizedHttp(self.credentials, http=build_http())
+            self._local.http = http
+        return http
 
     def authenticate(self):
         """Authenticate with Google Drive using OAuth 2.0"""
+        # Reuse the service built by an earlier call while its credentials are valid
+        if self.service and self.credentials and self.credentials.valid:
+            return True
+
         try:
             # Create credentials directory if it doesn't exist
             os.makedirs(os.path.dirname(TOKEN_PATH), exist_ok=True)
 
             if os.path.exists(TOKEN_PATH):
                 logger.debug("Loading existing credentials from token file")
-                with open(TOKEN_PATH, 'rb') as token:
-                    self.credentials = pickle.load(token)
+                self.credentials = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
 
             # If credentials don't exist or are invalid
             if not self.credentials or not self.credentials.valid:
@@ -57,10 +107,11 @@ class GoogleDriveConnector:
 
                 # Save credentials for future use
                 logger.debug("Saving credentials to token file")
-                with open(TOKEN_PATH, 'wb') as token:
-                    pickle.dump(self.credentials, token)
+                with open(TOKEN_PATH, 'w') as token:
+                    token.write(self.credentials.to_json())
 
-            self.service = build('drive', 'v3', credentials=self.credentials)
+            self.service = build('drive', 'v3', credentials=self.credentials, cache_discovery=False)
+            self._local = threading.local()
             logger.info("Successfully authenticated with Google Drive")
             return True
 
@@ -77,20 +128,15 @@ class GoogleDriveConnector:
         try:
             # Validate folder_id format
             folder_id = folder_id.strip()
-            if 'folders/' in folder_id:
-                folder_id = folder_id.split('folders/')[-1].split('?')[0]
+            url_match = FOLDER_URL_PATTERN.search(folder_id)
+            if url_match:
+                folder_id = url_match.group(1)
 
-            logger.debug(f"Querying files in folder: {folder_id}")
+            logger.debug("Querying files in folder: %s", folder_id)
             query = f"'{folder_id}' in parents and mimeType='application/pdf' and trashed=false"
             
-            results = self.service.files().list(
-                q=query,
-                fields="files(id, name, mimeType, modifiedTime)",
-                pageSize=100,
-                orderBy="modifiedTime desc"
-            ).execute()
-            
-            files = results.get('files', [])
+            files = self._list_files(query, orderBy="modifiedTime desc")
+            self._remember_metadata(files)
             if not files:
                 logger.warning(f"No PDF files found in folder {folder_id}")
                 return []
@@ -105,40 +151,131 @@ class GoogleDriveConnector:
             logger.error(f"Error listing files: {str(e)}")
             raise RuntimeError(f"Error listing files: {str(e)}")
 
-    def download_resume(self, file_id: str, output_path: str) -> bool:
-        """Download and validate a PDF file"""
+    def list_folder(self, folder_id: str) -> List[Dict[str, Any]]:
+        """List every file in a folder, whatever its type"""
         if not self.service:
             logger.error("Service not initialized")
-            raise ValueError("Not authenticated. Call authenticate() first")
+            raise RuntimeError("Not authenticated. Call authenticate() first")
 
         try:
-            # Validate file existence and type
-            file = self.service.files().get(
-                fileId=file_id,
-                fields='id, name, mimeType'
+            files = self._list_files(f"'{folder_id.strip()}' in parents and trashed=false")
+            self._remember_metadata(files)
+            return files
+        except HttpError as e:
+            logger.error(f"Google API error: {str(e)}")
+            raise RuntimeError(f"Google API error: {str(e)}")
+
+    def _list_files(self, query: str, **params) -> List[Dict[str, Any]]:
+        """Run a files().list query, following nextPageToken until every match is returned"""
+        files = []
+        page_token = None
+        while True:
+            response = self.service.files().list(
+                q=query,
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+                pageSize=LIST_PAGE_SIZE,
+                pageToken=page_token,
+                **params
             ).execute()
+            files.extend(response.get('files', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return files
+
+    def list_resumes_cached(self, folder_id: str, ttl: int = DRIVE_LIST_TTL, refresh: bool = False) -> List[Dict[str, Any]]:
+        """List PDF files in a folder, reusing a listing fetched within the last ttl seconds.
+
+        The listing carries each file's metadata, so repeated runs over the
+        same folder make no Drive requests until it expires. Pass
+        refresh=True to fetch a fresh listing.
+        """
+        key = f"drive-list:{folder_id.strip()}"
+        files = None if refresh else resume_cache.get(key)
+        if files is None:
+            files = self.list_resumes(folder_id)
+            resume_cache.set(key, files, expire=ttl)
+        else:
+            logger.debug("Using cached listing for folder %s", folder_id)
+            self._remember_metadata(files)
+        return files
+
+    def get_files_metadata(self, file_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch metadata for many files using batched requests.
+
+        Returns a mapping of file id to metadata; files that could not be
+        fetched are logged and left out.
+        """
+        if not self.service:
+            logger.error("Service not initialized")
+            raise ValueError("Not authenticated. Call authenticate() first")
+
+        metadata: Dict[str, Dict[str, Any]] = {}
+
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Failed to fetch metadata for {request_id}: {str(exception)}")
+            else:
+                metadata[request_id] = response
+
+        http = self._thread_http()
+        for start in range(0, len(file_ids), METADATA_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for file_id in file_ids[start:start + METADATA_BATCH_SIZE]:
+                batch.add(
+                    self.service.files().get(fileId=file_id, fields='id, name, mimeType'),
+                    request_id=file_id
+                )
+            batch.execute(http=http)
+
+        return metadata
+
+    def download_resume(
+        self,
+        file_id: str,
+        output: Union[str, IO[bytes]],
+        metadata: Optional[Dict[str, Any]] = None,
+        chunksize: int = DOWNLOAD_CHUNK_SIZE
+    ) -> bool:
+        """Download and validate a PDF file into a path or a writable binary buffer.
 
-            if not file:
-                raise ValueError(f"File {file_id} not found")
+        Metadata comes from the argument if given (e.g. from get_files_metadata),
+        else from an earlier listing of the file's folder; a files().get
+        request is only made for files this connector hasn't seen listed.
+        chunksize is the number of bytes fetched per media request.
+        """
+        if not self.service:
+            logger.error("Service not initialized")
+            raise ValueError("Not authenticated. Call authenticate() first")
+
+        try:
+            # Validate file existence and type
+            http = self._thread_http()
+            file = metadata or self._file_metadata.get(file_id)
+            if file is None:
+                file = self.service.files().get(
+                    fileId=file_id,
+                    fields='id, name, mimeType'
+                ).execute(http=http)
 
-            if file.get('mimeType') != 'application/pdf':
-                raise ValueError(f"File {file.get('name')} is not a PDF")
+            self._validate_pdf(file_id, file)
 
             # Download file
-            logger.debug(f"Downloading file {file.get('name')}")
+            logger.debug("Downloading file %s", file.get('name'))
             request = self.service.files().get_media(fileId=file_id)
+            request.http = http
             
-            with open(output_path, 'wb') as f:
-                downloader = MediaIoBaseDownload(f, request)
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
-                    if status:
-                        logger.debug(f"Download {int(status.progress() * 100)}%")
-
-            # Verify file was downloaded
-            if not os.path.exists(output_path):
-                raise RuntimeError(f"Failed to download file to {output_path}")
+            if isinstance(output, str):
+                # Buffer in memory and write the file with a single call
+                buffer = io.BytesIO()
+                self._download_media(request, buffer, chunksize)
+                with open(output, 'wb') as f:
+                    f.write(buffer.getbuffer())
+
+                # Verify file was downloaded
+                if not os.path.exists(output):
+                    raise RuntimeError(f"Failed to download file to {output}")
+            else:
+                self._download_media(request, output, chunksize)
 
             logger.info(f"Successfully downloaded {file.get('name')}")
             return True
@@ -148,4 +285,66 @@ class GoogleDriveConnector:
             raise RuntimeError(f"Google API error: {str(e)}")
         except Exception as e:
             logger.error(f"Failed to download file: {str(e)}")
-            raise RuntimeError(f"Failed to download file: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Failed to download file: {str(e)}")
+
+    async def download_many(
+        self,
+        file_ids: List[str],
+        out_dir: str,
+        max_concurrency: int = DOWNLOAD_CONCURRENCY
+    ) -> Dict[str, str]:
+        """Download many PDF files concurrently into out_dir.
+
+        Metadata is fetched with batched requests and the media downloads run
+        in parallel over one aiohttp session. Returns a mapping of file id to
+        downloaded path; failed files are logged and left out.
+        """
+        if not self.service:
+            logger.error("Service not initialized")
+            raise ValueError("Not authenticated. Call authenticate() first")
+
+        metadata = await asyncio.to_thread(self.get_files_metadata, file_ids)
+        if not self.credentials.valid:
+            await asyncio.to_thread(self.credentials.refresh, Request())
+        headers = {'Authorization': f'Bearer {self.credentials.token}'}
+        semaphore = asyncio.Semaphore(max_concurrency)
+        os.makedirs(out_dir, exist_ok=True)
+
+        async def fetch(session: aiohttp.ClientSession, file_id: str) -> Optional[str]:
+            try:
+                self._validate_pdf(file_id, metadata.get(file_id))
+                output_path = os.path.join(out_dir, f"{file_id}.pdf")
+                async with semaphore:
+                    async with session.get(MEDIA_URL.format(file_id=file_id)) as response:
+                        response.raise_for_status()
+                        async with aiofiles.open(output_path, 'wb') as f:
+                            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                                await f.write(chunk)
+                logger.info(f"Successfully downloaded {metadata[file_id].get('name')}")
+                return output_path
+            except Exception as e:
+                logger.error(f"Failed to download file {file_id}: {str(e)}")
+                return None
+
+        async with aiohttp.ClientSession(headers=headers) as session:
+            paths = await asyncio.gather(*(fetch(session, file_id) for file_id in file_ids))
+
+        return {file_id: path for file_id, path in zip(file_ids, paths) if path is not None}
+
+    @staticmethod
+    def _validate_pdf(file_id: str, file: Optional[Dict[str, Any]]) -> None:
+        """Raise if file metadata is missing or not a PDF"""
+        if not file:
+            raise ValueError(f"File {file_id} not found")
+
+        if file.get('mimeType') != 'application/pdf':
+            raise ValueError(f"File {file.get('name')} is not a PDF")
+
+    def _download_media(self, request, fh: IO[bytes], chunksize: int = DOWNLOAD_CHUNK_SIZE) -> None:
+        """Write a media request to a binary file handle chunk by chunk"""
+        downloader = MediaIoBaseDownload(fh, request, chunksize=chunksize)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk()
+            if status and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Download %d%%", int(status.progress() * 100))
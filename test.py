@@ -1,23 +1,41 @@
-from storage import GoogleDriveConnector
+from storage import GoogleDriveConnector, FOLDER_URL_PATTERN
 import os
+import logging
+import re
+import sys
+import argparse
+from functools import lru_cache
 from typing import Optional
 
-def get_folder_contents(folder_id: str) -> None:
-    """Test Google Drive connection and list contents of a folder"""
+logger = logging.getLogger(__name__)
+
+# Google Drive folder IDs: 33 letters, digits, hyphens or underscores
+FOLDER_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{33}')
+
+def drive_user_email(service) -> str:
+    """Email of the account a Drive service is authenticated as"""
+    return service.about().get(fields="user").execute()['user']['emailAddress']
+
+def get_folder_contents(folder_id: str, download: Optional[bool] = None) -> None:
+    """Test Google Drive connection and list contents of a folder.
+
+    download chooses whether to fetch the first resume; None asks the user,
+    when running in a terminal.
+    """
     connector = GoogleDriveConnector()
     
     try:
         # Authenticate
-        print("🔑 Authenticating with Google Drive...")
+        logger.info("🔑 Authenticating with Google Drive...")
         connector.authenticate()
-        print("✅ Authentication successful!")
+        logger.info("✅ Authentication successful!")
         
         # Show which account we're using
-        about = connector.service.about().get(fields="user").execute()
-        print(f"👤 Using account: {about['user']['emailAddress']}")
+        user_email = drive_user_email(connector.service)
+        logger.info(f"👤 Using account: {user_email}")
         
         # First verify folder access with better error handling
-        print(f"\n🔍 Verifying folder access...")
+        logger.info(f"\n🔍 Verifying folder access...")
         try:
             # Try to get folder metadata with more fields for better debugging
             folder = connector.service.files().get(
@@ -25,115 +43,133 @@ def get_folder_contents(folder_id: str) -> None:
                 fields='name,mimeType,capabilities,owners,shared,permissions'
             ).execute()
             
-            print(f"✅ Found folder: {folder.get('name', 'Unknown')}")
-            print(f"👥 Owner: {folder['owners'][0]['emailAddress']}")
-            print(f"🔗 Shared: {'Yes' if folder.get('shared') else 'No'}")
+            logger.info(f"✅ Found folder: {folder.get('name', 'Unknown')}")
+            logger.info(f"👥 Owner: {folder['owners'][0]['emailAddress']}")
+            logger.info(f"🔗 Shared: {'Yes' if folder.get('shared') else 'No'}")
             
             if not folder.get('shared'):
-                print("\n⚠️ This folder is not shared")
-                print("💡 Ask the folder owner to share it with:", about['user']['emailAddress'])
+                logger.warning("\n⚠️ This folder is not shared")
+                logger.info(f"💡 Ask the folder owner to share it with: {user_email}")
                 return
                 
             if folder.get('mimeType') != 'application/vnd.google-apps.folder':
-                print("❌ The provided ID is not a folder")
+                logger.error("❌ The provided ID is not a folder")
                 return
                 
         except Exception as e:
             error_message = str(e).lower()
             if "404" in error_message:
-                print("❌ Folder not found")
-                print("\n💡 Troubleshooting tips:")
-                print("1. Make sure the folder exists in Google Drive")
-                print("2. Verify the folder is shared with:", about['user']['emailAddress'])
-                print("3. Try opening this URL in your browser:")
-                print(f"   https://drive.google.com/drive/folders/{folder_id}")
+                logger.error("❌ Folder not found")
+                logger.info("\n💡 Troubleshooting tips:")
+                logger.info("1. Make sure the folder exists in Google Drive")
+                logger.info(f"2. Verify the folder is shared with: {user_email}")
+                logger.info("3. Try opening this URL in your browser:")
+                logger.info(f"   https://drive.google.com/drive/folders/{folder_id}")
                 return
             elif "403" in error_message:
-                print("❌ Access denied")
-                print("\n💡 Troubleshooting tips:")
-                print(f"1. Make sure the folder is shared with: {about['user']['emailAddress']}")
-                print("2. The sharing settings should be at least 'Viewer'")
-                print("3. Try accessing the folder in your browser first:")
-                print(f"   https://drive.google.com/drive/folders/{folder_id}")
+                logger.error("❌ Access denied")
+                logger.info("\n💡 Troubleshooting tips:")
+                logger.info(f"1. Make sure the folder is shared with: {user_email}")
+                logger.info("2. The sharing settings should be at least 'Viewer'")
+                logger.info("3. Try accessing the folder in your browser first:")
+                logger.info(f"   https://drive.google.com/drive/folders/{folder_id}")
                 return
             else:
-                print(f"❌ Error accessing folder: {str(e)}")
+                logger.error(f"❌ Error accessing folder: {str(e)}")
                 return
 
-        # List all files (not just resumes) to check folder contents
-        print("\n📂 Scanning folder contents...")
-        all_files = connector.service.files().list(
-            q=f"'{folder_id}' in parents",
-            spaces='drive',
-            fields='files(id, name, mimeType)'
-        ).execute().get('files', [])
+        # List all files once; resumes are picked out of the same listing
+        logger.info("\n📂 Scanning folder contents...")
+        all_files = connector.list_folder(folder_id)
         
         if not all_files:
-            print("❌ Folder is empty")
+            logger.error("❌ Folder is empty")
             return
             
-        print(f"📄 Found {len(all_files)} total files:")
+        logger.info(f"📄 Found {len(all_files)} total files:")
         for file in all_files:
-            print(f"  - {file['name']} ({file['mimeType']})")
+            logger.debug(f"  - {file['name']} ({file['mimeType']})")
         
         # Now list only resumes
-        print("\n🔍 Filtering for resume files...")
-        files = connector.list_resumes(folder_id)
+        logger.info("\n🔍 Filtering for resume files...")
+        files = [file for file in all_files if file['mimeType'] == 'application/pdf']
         
         if not files:
-            print("⚠️ No resume files found (looking for PDF and DOCX files)")
-            print("💡 Make sure your resumes are in PDF or DOCX format")
+            logger.warning("⚠️ No resume files found (looking for PDF and DOCX files)")
+            logger.info("💡 Make sure your resumes are in PDF or DOCX format")
             return
             
-        print(f"✅ Found {len(files)} resume(s):")
+        logger.info(f"✅ Found {len(files)} resume(s):")
         for file in files:
-            print(f"  - {file['name']}")
+            logger.info(f"  - {file['name']}")
             
         # Optional: Download first file as test
-        if files and input("\nDownload first file? (y/n): ").lower() == 'y':
+        if download is None:
+            download = sys.stdin.isatty() and input("\nDownload first file? (y/n): ").lower() == 'y'
+        if files and download:
             first_file = files[0]
             output_path = f"downloads/{first_file['name']}"
             os.makedirs("downloads", exist_ok=True)
             
-            print(f"📥 Downloading {first_file['name']}...")
+            logger.info(f"📥 Downloading {first_file['name']}...")
             connector.download_resume(first_file['id'], output_path)
-            print(f"✅ File downloaded to: {output_path}")
+            logger.info(f"✅ File downloaded to: {output_path}")
             
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        logger.error(f"❌ Error: {str(e)}")
         if "insufficient permission" in str(e).lower():
-            print("\n💡 Troubleshooting tips:")
-            print("1. Make sure you've shared the folder with your Google account")
-            print("2. Verify you have at least 'Viewer' access to the folder")
-            print("3. Try opening the folder in your browser to confirm access")
+            logger.info("\n💡 Troubleshooting tips:")
+            logger.info("1. Make sure you've shared the folder with your Google account")
+            logger.info("2. Verify you have at least 'Viewer' access to the folder")
+            logger.info("3. Try opening the folder in your browser to confirm access")
 
 def validate_folder_id(folder_id: str) -> bool:
     """
     Validate Google Drive folder ID format
     Returns True if the format is valid, False otherwise
     """
-    # Basic validation - checking length and allowed characters
+    return bool(folder_id) and FOLDER_ID_PATTERN.fullmatch(folder_id) is not None
+
+def parse_folder_id(value: str) -> Optional[str]:
+    """Extract a folder ID from a Drive folder URL or a bare ID; None if it isn't valid"""
+    value = value.strip()
+    if 'drive.google.com' in value:
+        url_match = FOLDER_URL_PATTERN.search(value)
+        value = url_match.group(1) if url_match else ''
+    return value if validate_folder_id(value) else None
+
+@lru_cache(maxsize=None)
+def env_folder_id() -> Optional[str]:
+    """GOOGLE_DRIVE_FOLDER_ID parsed and validated once; None if unset or invalid"""
+    value = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
+    if not value:
+        return None
+    folder_id = parse_folder_id(value)
     if not folder_id:
-        return False
-    
-    # Google Drive IDs are typically 33 characters
-    if len(folder_id) != 33:
-        return False
-    
-    # Should only contain alphanumeric characters and hyphens
-    valid_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
-    return all(c in valid_chars for c in folder_id)
+        logger.warning(f"⚠️ Ignoring invalid GOOGLE_DRIVE_FOLDER_ID: {value!r}")
+    return folder_id
+
+def get_folder_id(args: argparse.Namespace) -> Optional[str]:
+    """Get folder ID from command-line arguments, environment or user input.
+
+    The user is only prompted when running in a terminal, so the script can
+    run unattended.
+    """
+    folder_arg = args.folder_id or args.folder_url
+    if folder_arg:
+        folder_id = parse_folder_id(folder_arg)
+        if not folder_id:
+            logger.error("❌ Invalid folder ID format")
+        return folder_id
 
-def get_folder_id() -> Optional[str]:
-    """Get folder ID from environment or user input"""
-    folder_id = os.getenv('GOOGLE_DRIVE_FOLDER_ID')
+    folder_id = env_folder_id()
     
-    if not folder_id:
-        print("\n🔍 To find your folder ID:")
-        print("1. Open the folder in Google Drive")
-        print("2. Right-click the folder and select 'Get link'")
-        print("3. The folder ID is the last part of the URL after 'folders/'")
-        print("\nExample URL: https://drive.google.com/drive/folders/1AbCdEfGhIjKlMnOpQrStUvWxYz1234567")
+    if not folder_id and sys.stdin.isatty():
+        logger.info("\n🔍 To find your folder ID:")
+        logger.info("1. Open the folder in Google Drive")
+        logger.info("2. Right-click the folder and select 'Get link'")
+        logger.info("3. The folder ID is the last part of the URL after 'folders/'")
+        logger.info("\nExample URL: https://drive.google.com/drive/folders/1AbCdEfGhIjKlMnOpQrStUvWxYz1234567")
         
         while True:
             user_input = input("\nEnter Google Drive folder URL or ID (or 'q' to quit): ").strip()
@@ -141,27 +177,34 @@ def get_folder_id() -> Optional[str]:
             if user_input.lower() == 'q':
                 return None
             
-            # Extract folder ID if full URL is provided
-            if 'drive.google.com' in user_input:
-                try:
-                    folder_id = user_input.split('folders/')[-1].split('?')[0].split('/')[0]
-                except IndexError:
-                    print("❌ Invalid URL format")
-                    continue
-            else:
-                folder_id = user_input
-            
-            if validate_folder_id(folder_id):
+            folder_id = parse_folder_id(user_input)
+            if folder_id:
                 return folder_id
             else:
-                print("❌ Invalid folder ID format")
-                print("💡 The folder ID should be 33 characters long and contain only letters, numbers, hyphens, and underscores")
+                logger.error("❌ Invalid folder ID format")
+                logger.info("💡 The folder ID should be 33 characters long and contain only letters, numbers, hyphens, and underscores")
     
     return folder_id
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check Google Drive access to a folder of resumes")
+    folder = parser.add_mutually_exclusive_group()
+    folder.add_argument("--folder-id", help="Google Drive folder ID")
+    folder.add_argument("--folder-url", help="Google Drive folder URL")
+    parser.add_argument(
+        "--download",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Download the first resume (asks when omitted and running in a terminal)"
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    folder_id = get_folder_id()
+    # Plain messages at LOG_LEVEL; replaces the setup storage does on import
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s", force=True)
+    args = parse_args()
+    folder_id = get_folder_id(args)
     if folder_id:
-        get_folder_contents(folder_id)
+        get_folder_contents(folder_id, download=args.download)
     else:
-        print("❌ No folder ID provided")
\ No newline at end of file
+        logger.error("❌ No folder ID provided")
@@ -1,9 +1,130 @@
 import os
-import json
-import requests
-import tempfile
+import logging
+import io
+import orjson
+import asyncio
+import aiohttp
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Optional
 from dotenv import load_dotenv
 from storage import GoogleDriveConnector
+from utils import retry_on_429
+
+logger = logging.getLogger(__name__)
+
+# Number of resumes downloaded and screened at once
+CONCURRENT_RESUMES = 8
+# Screening results are appended here as JSON Lines, one resume per line
+RESULTS_PATH = 'test_results.jsonl'
+
+# Resumes up to this size are fetched from Drive in a single media request
+DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Threads running blocking Drive downloads, one per concurrently screened resume
+DOWNLOAD_WORKERS = CONCURRENT_RESUMES
+
+@retry_on_429()
+async def post_resume(
+    session: aiohttp.ClientSession,
+    url: str,
+    resume_bytes: bytes,
+    requirements_bytes: bytes
+) -> aiohttp.ClientResponse:
+    """POST a resume for screening, returning the response with its body already read.
+
+    The resume is sent as bytes rather than a file object: aiohttp closes file
+    payloads once sent, which would break a retry after a 429.
+    """
+    form = aiohttp.FormData()
+    form.add_field('file', resume_bytes, filename='resume.pdf', content_type='application/pdf')
+    form.add_field('requirements', requirements_bytes, filename='requirements.json', content_type='application/json')
+    
+    response = await session.post(url, data=form)
+    await response.read()
+    return response
+
+async def process_resume(
+    semaphore: asyncio.Semaphore,
+    session: aiohttp.ClientSession,
+    drive_connector: GoogleDriveConnector,
+    download_pool: ThreadPoolExecutor,
+    resume: dict,
+    url: str,
+    requirements_bytes: bytes,
+    results_file: IO[bytes]
+):
+    """Download one resume from Drive and screen it, returning the result or None on failure.
+
+    Successful results are written to results_file as soon as they arrive.
+    """
+    async with semaphore:
+        logger.info(f"\nProcessing: {resume['name']}")
+        
+        try:
+            # Download resume into memory; it is posted as bytes anyway
+            resume_file = io.BytesIO()
+            # The listing entry doubles as metadata, saving a files().get per resume
+            await asyncio.get_running_loop().run_in_executor(download_pool, partial(
+                drive_connector.download_resume, resume['id'], resume_file,
+                metadata=resume, chunksize=DOWNLOAD_CHUNK_SIZE
+            ))
+            resume_bytes = resume_file.getvalue()
+            
+            # Test single resume screening
+            response = await post_resume(session, url, resume_bytes, requirements_bytes)
+            
+            if response.status == 200:
+                result = orjson.loads(await response.read())
+                result['file_name'] = resume['name']
+                results_file.write(orjson.dumps(result) + b"\n")
+                logger.info(f"Successfully processed {resume['name']}")
+                return result
+            else:
+                logger.error(f"Error processing {resume['name']}: {await response.text()}")
+                return None
+        except Exception as e:
+            # One failed resume shouldn't abort the others still in flight
+            logger.error(f"Error processing {resume['name']}: {str(e)}")
+            return None
+
+async def screen_folder(
+    drive_connector: GoogleDriveConnector,
+    base_url: str,
+    folder_id: str,
+    requirements_bytes: bytes,
+    results_file: IO[bytes]
+) -> Optional[list]:
+    """Check the API is up, then screen every resume in a Drive folder.
+
+    All requests share one pooled keep-alive session; resumes are screened
+    concurrently, up to CONCURRENT_RESUMES at a time. Returns None if the
+    folder could not be listed.
+    """
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=16)) as session:
+        # Step 1: Test health check
+        logger.info("\n1. Testing health check endpoint...")
+        async with session.get(f"{base_url}/health/") as health_response:
+            logger.info(f"Health check status: {await health_response.json()}")
+
+        # Step 2: Process Drive resumes concurrently
+        logger.info("\n2. Processing resumes from Drive...")
+        try:
+            resumes = await asyncio.to_thread(drive_connector.list_resumes_cached, folder_id)
+            logger.info(f"Found {len(resumes)} resumes in the folder")
+        except Exception as e:
+            logger.error(f"Error listing resumes: {str(e)}")
+            return None
+
+        semaphore = asyncio.Semaphore(CONCURRENT_RESUMES)
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as download_pool:
+            results = await asyncio.gather(*(
+                process_resume(
+                    semaphore, session, drive_connector, download_pool,
+                    resume, f"{base_url}/screen-resume/", requirements_bytes, results_file
+                )
+                for resume in resumes
+            ))
+    return [result for result in results if result is not None]
 
 def test_backend_processing():
     # Initialize
@@ -11,12 +132,12 @@ def test_backend_processing():
     drive_connector = GoogleDriveConnector()
     
     # Authenticate Google Drive
-    print("Authenticating Google Drive...")
+    logger.info("Authenticating Google Drive...")
     try:
         drive_connector.authenticate()
     except Exception as e:
-        print(f"Authentication failed: {str(e)}")
-        print("Make sure GOOGLE_APPLICATION_CREDENTIALS is set in .env file")
+        logger.error(f"Authentication failed: {str(e)}")
+        logger.info("Make sure GOOGLE_APPLICATION_CREDENTIALS is set in .env file")
         return
 
     # API endpoint
@@ -31,78 +152,26 @@ def test_backend_processing():
         "description": "Test role"
     }
     
-    # Save requirements to a temp file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as req_file:
-        json.dump(requirements, req_file)
-        requirements_path = req_file.name
+    # Serialize requirements once; every request sends the same bytes
+    requirements_bytes = orjson.dumps(requirements)
     
     try:
-        # Step 1: Test health check
-        print("\n1. Testing health check endpoint...")
-        health_response = requests.get(f"{BASE_URL}/health/")
-        print(f"Health check status: {health_response.json()}")
-
-        # Step 2: Process Drive resumes one by one
-        print("\n2. Processing resumes from Drive...")
         folder_id = "14rYV8_owcVrxDNX3YiuAOV3p8z3T0r_w"
-        
-        try:
-            resumes = drive_connector.list_resumes(folder_id)
-            print(f"Found {len(resumes)} resumes in the folder")
-        except Exception as e:
-            print(f"Error listing resumes: {str(e)}")
+        # Results are saved as they complete, so a crash only loses in-flight resumes
+        with open(RESULTS_PATH, 'wb') as results_file:
+            results = asyncio.run(screen_folder(
+                drive_connector, BASE_URL, folder_id, requirements_bytes, results_file
+            ))
+        if results is None:
             return
-        
-        results = []
-        for resume in resumes:
-            print(f"\nProcessing: {resume['name']}")
             
-            # Download resume to temp file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                drive_connector.download_resume(resume['id'], temp_file.name)
-                
-                try:
-                    # Test single resume screening
-                    with open(temp_file.name, 'rb') as resume_file:
-                        files = {
-                            'file': ('resume.pdf', resume_file, 'application/pdf'),
-                            'requirements': ('requirements.json', open(requirements_path, 'rb'), 'application/json')
-                        }
-                        
-                        response = requests.post(
-                            f"{BASE_URL}/screen-resume/",
-                            files=files
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            result['file_name'] = resume['name']
-                            results.append(result)
-                            print(f"Successfully processed {resume['name']}")
-                        else:
-                            print(f"Error processing {resume['name']}: {response.text}")
-                            
-                finally:
-                    # Clean up temp resume file
-                    if os.path.exists(temp_file.name):
-                        os.unlink(temp_file.name)
-        
-        # Save results to JSON
-        print("\nSaving results...")
-        with open('test_results.json', 'w') as f:
-            json.dump(results, f, indent=2)
-            
-        print(f"\nProcessing complete! Processed {len(results)} resumes")
-        print("Results saved to test_results.json")
+        logger.info(f"\nProcessing complete! Processed {len(results)} resumes")
+        logger.info(f"Results saved to {RESULTS_PATH}")
         
     except Exception as e:
-        print(f"Error: {str(e)}")
-    
-    
-    finally:
-        # Clean up requirements file
-        if os.path.exists(requirements_path):
-            os.unlink(requirements_path)
+        logger.error(f"Error: {str(e)}")
 
 if __name__ == "__main__":
+    # Plain messages at LOG_LEVEL; replaces the setup storage does on import
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s", force=True)
     test_backend_processing()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+processor = pytest.importorskip("processor")
+ResumeProcessor = processor.ResumeProcessor
+
+
+def test_skills_section_reads_list_under_header():
+    text = "Jane Doe\n\nTechnical Skills\nPython, Docker, SQL\n\nExperience\nEngineer"
+    assert ResumeProcessor._skills_section(text) == "Python, Docker, SQL"
+
+
+def test_skills_section_reads_paragraph_after_standalone_header():
+    text = "Skills\n\nPython, Docker, SQL\n\nEducation\nBSc"
+    assert ResumeProcessor._skills_section(text) == "Python, Docker, SQL"
+
+
+def test_skills_section_ignores_skills_mentioned_in_prose():
+    text = (
+        "Summary\n"
+        "Engineer with strong communication skills and a focus on\n"
+        "delivery, mentoring, planning and customer work.\n\n"
+        "Experience\nEngineer at Acme"
+    )
+    assert ResumeProcessor._skills_section(text) == ""
+
+
+def test_chunk_batches_fit_model_context():
+    requirements = {
+        "required_skills": ["Python", "FastAPI", "Docker"],
+        "experience": "2 years",
+        "education": "Bachelors in Computer Science",
+    }
+    requirements_tokens = len("Python, FastAPI, Docker2 yearsBachelors in Computer Science") // 4
+    budget = ResumeProcessor._batch_token_budget(requirements)
+    chunks = ["x" * processor.CHUNK_TOKEN_LIMIT * 4] * 10
+    batches = ResumeProcessor._batch_chunks(chunks, budget)
+
+    assert sum(map(len, batches)) == len(chunks)
+    assert any(len(batch) > 1 for batch in batches)
+    for batch in batches:
+        prompt_tokens = processor.CHUNK_PROMPT_TOKENS + requirements_tokens + sum(len(chunk) // 4 for chunk in batch)
+        completion_tokens = processor.CHUNK_RESULT_TOKENS * len(batch)
+        assert prompt_tokens + completion_tokens <= processor.CHUNK_MODEL_CONTEXT
+
+
+def test_skills_section_reads_inline_list_after_colon():
+    text = (
+        "Jane Doe\n\nSkills: Python, Docker, Kubernetes, SQL\n\n"
+        "Education\nBSc Computer Science\nMIT\n2015 - 2019"
+    )
+    assert ResumeProcessor._skills_section(text) == "Python, Docker, Kubernetes, SQL"
+
+
+def test_skills_section_inline_list_stops_at_its_line():
+    text = "Technical Skills: Python, Go, AWS\nSenior Engineer\nAcme\n2019 - 2023\nBuilt services"
+    assert ResumeProcessor._skills_section(text) == "Python, Go, AWS"
+
+
+def test_extract_experience_reads_entries():
+    text = "Engineer\nAcme\n2019 - 2023\nBuilt services\n\nDeveloper\nInitech\n2015 - 2019\nMaintained reports"
+    assert [entry['company'] for entry in ResumeProcessor._extract_experience(text)] == ["Acme", "Initech"]
+
+
+def test_extract_experience_is_linear_on_long_lines():
+    # The unanchored pattern took seconds here, rescanning the line from every character
+    text = "a" * 200_000
+    start = time.perf_counter()
+    assert ResumeProcessor._extract_experience(text) == []
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.parametrize("text", ["xéai", "Python, SQL and AI", "café java", "ai/ml on node.js", "KUBERNETES"])
+def test_skill_scan_backends_agree(monkeypatch, text):
+    if processor.SKILLS_DATABASE is None:
+        pytest.skip("Hyperscan is not available")
+    hyperscan_skills = ResumeProcessor._extract_technical_skills(text)
+    monkeypatch.setattr(processor, "SKILLS_DATABASE", None)
+    assert ResumeProcessor._extract_technical_skills(text) == hyperscan_skills
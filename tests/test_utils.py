@@ -0,0 +1,23 @@
+from utils import match_skills
+
+
+def test_match_skills_keeps_symbol_variants_apart():
+    required = ["C++", "C", "Objective-C", "C#"]
+    assert match_skills(required, ["C#"]) == ["C#"]
+    assert match_skills(required, ["c++"]) == ["C++"]
+
+
+def test_match_skills_rejects_partial_skill_names():
+    required = ["Machine Learning", "Google Cloud", "React Native"]
+    assert match_skills(required, ["learning", "cloud", "react"]) == []
+
+
+def test_match_skills_accepts_spelling_variants():
+    required = ["Python", "Node.js", "Machine Learning"]
+    found = ["python", "NodeJS", "machine-learning"]
+    assert match_skills(required, found) == required
+
+
+def test_match_skills_handles_empty_inputs():
+    assert match_skills([], ["Python"]) == []
+    assert match_skills(["Python"], []) == []
@@ -1,60 +1,266 @@
+import re
 import time
+import random
+import asyncio
 import logging
-from functools import wraps
-from typing import Callable, Any
+import threading
+from collections import deque
+from functools import lru_cache, wraps
+from itertools import islice
+from typing import Callable, Any, Iterable, Iterator, List, Optional, Tuple
+from rapidfuzz import process, fuzz
+
+try:
+    import tiktoken
+except ImportError:  # Without tiktoken, tokens are estimated as 4 characters each
+    tiktoken = None
 
 def rate_limit(calls: int, period: float = 60.0) -> Callable:
-    """Rate limiting decorator"""
-    timestamps = []
+    """Rate limiting decorator, safe to share between threads.
+
+    Each call reserves the next free slot in the window under a lock and then
+    sleeps outside it, so concurrent callers queue up instead of all seeing
+    the same free slot. See GroqRateLimiter for async code.
+    """
+    timestamps = deque()
+    lock = threading.Lock()
     
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            now = time.time()
-            
-            # Remove timestamps older than our period
-            while timestamps and now - timestamps[0] > period:
-                timestamps.pop(0)
+            with lock:
+                # Monotonic time can't jump backwards and corrupt the window
+                now = time.monotonic()
                 
-            # Check if we've hit our rate limit
-            if len(timestamps) >= calls:
-                sleep_time = timestamps[0] + period - now
-                if sleep_time > 0:
-                    logging.info(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
-                    time.sleep(sleep_time)
+                # Remove timestamps older than our period
+                while timestamps and now - timestamps[0] > period:
+                    timestamps.popleft()
                     
-            timestamps.append(now)
+                # Check if we've hit our rate limit; reservations are ordered, so the
+                # call `calls` places back is the one that must leave the window first
+                sleep_time = timestamps[-calls] + period - now if len(timestamps) >= calls else 0
+                timestamps.append(now + max(sleep_time, 0))
+                
+            if sleep_time > 0:
+                logging.info(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
+                time.sleep(sleep_time)
+                
             return func(*args, **kwargs)
         return wrapper
     return decorator
 
+def retry_on_429(max_retries: int = 5, base: float = 1.0) -> Callable:
+    """Retry a function returning an HTTP response while the server answers 429.
+
+    Waits as long as the response's Retry-After header asks, falling back to
+    exponential backoff with full jitter. Works with requests, httpx and
+    aiohttp responses, on both sync and async functions.
+    """
+    def retry_delay(response, attempt: int) -> Optional[float]:
+        # None means the response is not rate limited and should be returned
+        if getattr(response, 'status_code', getattr(response, 'status', None)) != 429:
+            return None
+        try:
+            delay = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            delay = random.uniform(0, base * 2 ** attempt)
+        # Free the connection held by the discarded response
+        (getattr(response, 'release', None) or response.close)()
+        logging.info(f"Rate limited by server, retrying in {delay:.2f}s")
+        return delay
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                for attempt in range(max_retries):
+                    response = await func(*args, **kwargs)
+                    delay = retry_delay(response, attempt)
+                    if delay is None:
+                        return response
+                    await asyncio.sleep(delay)
+                return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            for attempt in range(max_retries):
+                response = func(*args, **kwargs)
+                delay = retry_delay(response, attempt)
+                if delay is None:
+                    return response
+                time.sleep(delay)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class GroqRateLimiter:
+    """Budget of LLM requests per minute, shared by sync and async callers.
+
+    The request rate is capped by a token bucket that refills at
+    requests_per_minute / 60 tokens per second and holds at most
+    max_concurrency tokens, so bursts stay small. Used as an async context
+    manager it also caps concurrent requests with a semaphore; blocking code
+    running in threads calls wait() instead.
+    """
+    def __init__(self, requests_per_minute: int, max_concurrency: int):
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._rate = requests_per_minute / 60.0
+        self._capacity = float(max_concurrency)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+
+    async def __aenter__(self) -> "GroqRateLimiter":
+        await self._semaphore.acquire()
+        try:
+            sleep_time = self._reserve()
+            if sleep_time > 0:
+                logging.debug("LLM rate limit reached, sleeping for %.2fs", sleep_time)
+                await asyncio.sleep(sleep_time)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+    def wait(self) -> None:
+        """Block the calling thread until a request fits in the budget"""
+        sleep_time = self._reserve()
+        if sleep_time > 0:
+            logging.debug("LLM rate limit reached, sleeping for %.2fs", sleep_time)
+            time.sleep(sleep_time)
+
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait before it is available.
+
+        The bucket may go into debt, so each caller's wait accounts for every
+        reservation made before it and tokens are handed out in arrival order.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+# A sentence and its closing punctuation; trailing text without punctuation counts too
+SENTENCE_PATTERN = re.compile(r'[^.!?]+[.!?]*')
+
+def iter_sentences(text: str) -> Iterator[str]:
+    """Yield the stripped, non-empty sentences of text one at a time"""
+    for match in SENTENCE_PATTERN.finditer(text):
+        sentence = match.group().strip()
+        if sentence:
+            yield sentence
+
+# Tokenizer used to count chunk_text tokens, and how many sentences it encodes per call
+TOKEN_ENCODING = "cl100k_base"
+TOKEN_COUNT_BATCH = 256
+
+@lru_cache(maxsize=1)
+def _token_encoding():
+    """Load the tiktoken encoding on first use; None if tiktoken or its data is unavailable"""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception as e:
+        logging.warning(f"Falling back to estimated token counts: {str(e)}")
+        return None
+
+def iter_sentence_tokens(text: str) -> Iterator[Tuple[str, float]]:
+    """Yield each sentence of text with its token count.
+
+    Counts are exact when tiktoken is available, encoding sentences in
+    batches to amortize the call overhead; otherwise they are estimated at
+    4 characters per token, including the space joining sentences.
+    """
+    sentences = iter_sentences(text)
+    encoding = _token_encoding()
+    if encoding is None:
+        for sentence in sentences:
+            yield sentence, (len(sentence) + 1) / 4
+        return
+
+    while batch := list(islice(sentences, TOKEN_COUNT_BATCH)):
+        for sentence, tokens in zip(batch, encoding.encode_ordinary_batch(batch)):
+            yield sentence, len(tokens)
+
 def chunk_text(text: str, max_tokens: int = 4000) -> list[str]:
-    """Split text into chunks that respect sentence boundaries"""
-    # Approximate tokens (rough estimate: 4 chars = 1 token)
-    chars_per_chunk = max_tokens * 4
-    
-    # Split into sentences (naive approach)
-    sentences = [s.strip() for s in text.split('.') if s.strip()]
-    
+    """Split text into chunks of at most max_tokens that respect sentence boundaries"""
+    text = text.strip()
+    if not text:
+        return []
+
+    # Most resumes fit in one chunk; return them whole without splitting sentences
+    encoding = _token_encoding()
+    if encoding is None:
+        fits = len(text) <= max_tokens * 4
+    else:
+        # A token is at least one UTF-8 byte, so the length check saves encoding short text
+        fits = len(text.encode()) <= max_tokens or len(encoding.encode_ordinary(text)) <= max_tokens
+    if fits:
+        return [text]
+
     chunks = []
     current_chunk = []
-    current_length = 0
+    current_tokens = 0
     
-    for sentence in sentences:
-        sentence_length = len(sentence)
-        
-        if current_length + sentence_length > chars_per_chunk:
+    # Sentences are streamed, so only the chunk being built is held in memory
+    for sentence, sentence_tokens in iter_sentence_tokens(text):
+        if current_tokens + sentence_tokens > max_tokens:
             # Save current chunk if it's not empty
             if current_chunk:
-                chunks.append('. '.join(current_chunk) + '.')
+                chunks.append(' '.join(current_chunk))
                 current_chunk = []
-                current_length = 0
+                current_tokens = 0
         
         current_chunk.append(sentence)
-        current_length += sentence_length
+        current_tokens += sentence_tokens
     
     # Add any remaining text
     if current_chunk:
-        chunks.append('. '.join(current_chunk) + '.')
+        chunks.append(' '.join(current_chunk))
     
-    return chunks
\ No newline at end of file
+    return chunks
+
+# Runs of characters that separate words in a skill name; "+", "#" and "." are
+# kept so that C, C# and C++ (or .NET and NET) stay distinct
+SKILL_SEPARATOR_PATTERN = re.compile(r'[^\w+#.]+')
+
+def normalize_skill(skill: str) -> str:
+    """Casefold a skill name and collapse separators, keeping the symbols that tell skills apart"""
+    return SKILL_SEPARATOR_PATTERN.sub(' ', skill.casefold()).strip().rstrip('.')
+
+def match_skills(required_skills: Iterable[str], found_skills: Iterable[str], score_cutoff: float = 80) -> List[str]:
+    """Return the required skills that match any of the found skills.
+
+    Skills are compared after normalize_skill. An exact match wins outright;
+    the rest are compared whole with token_sort_ratio, so a found skill has
+    to resemble the entire required name ("React" does not match "React
+    Native", nor "C#" match "C++").
+    """
+    required_skills = list(required_skills)
+    found = {normalize_skill(skill) for skill in found_skills}
+    found.discard('')
+    if not required_skills or not found:
+        return []
+
+    required = [normalize_skill(skill) for skill in required_skills]
+    fuzzy = [i for i, skill in enumerate(required) if skill not in found]
+    matched = set(range(len(required))).difference(fuzzy)
+    if fuzzy:
+        # Scores below the cutoff come back as 0
+        scores = process.cdist(
+            [required[i] for i in fuzzy],
+            list(found),
+            scorer=fuzz.token_sort_ratio,
+            processor=None,
+            score_cutoff=score_cutoff,
+            workers=-1
+        )
+        matched.update(i for i, row in zip(fuzzy, scores) if row.max() > 0)
+    return [skill for i, skill in enumerate(required_skills) if i in matched]